@@ -29,6 +29,10 @@ setup(
         "click>=8.1.0",
         "tqdm>=4.64.0",
     ],
+    extras_require={
+        "fast": ["orjson>=3.6.0"],
+        "prescan": ["numpy>=1.20"],
+    },
     entry_points={
         'console_scripts': [
             'text-sanitizer=src.cli.cli:main',
@@ -1,6 +1,8 @@
 import click
 import sys
 import os
+import signal
+import threading
 from pathlib import Path
 
 # 设置项目路径
@@ -23,30 +25,48 @@ def import_modules():
     
     try:
         # 方式1: 绝对导入
+        from src.core.ledger import WorkLedger
         from src.core.processor import BatchProcessor
         from src.languages.factory import LanguageProcessorFactory
+        from src.utils.compression import COMPRESSION_CHOICES
+        from src.utils.file_handler import FORMAT_SUFFIXES
         from src.utils.logger import logger
+        from src.utils.metrics import MetricsSnapshotWriter, start_http_server
         modules.update({
             'BatchProcessor': BatchProcessor,
             'LanguageProcessorFactory': LanguageProcessorFactory,
+            'COMPRESSION_CHOICES': COMPRESSION_CHOICES,
+            'FORMAT_SUFFIXES': FORMAT_SUFFIXES,
+            'WorkLedger': WorkLedger,
+            'MetricsSnapshotWriter': MetricsSnapshotWriter,
+            'start_http_server': start_http_server,
             'logger': logger
         })
-        print("✅ 使用绝对导入")
+        print("✅ 使用绝对导入", file=sys.stderr)
     except ImportError as e1:
-        print(f"绝对导入失败: {e1}")
+        print(f"绝对导入失败: {e1}", file=sys.stderr)
         try:
             # 方式2: 相对导入
+            from ..core.ledger import WorkLedger
             from ..core.processor import BatchProcessor
             from ..languages.factory import LanguageProcessorFactory
+            from ..utils.compression import COMPRESSION_CHOICES
+            from ..utils.file_handler import FORMAT_SUFFIXES
             from ..utils.logger import logger
+            from ..utils.metrics import MetricsSnapshotWriter, start_http_server
             modules.update({
                 'BatchProcessor': BatchProcessor,
                 'LanguageProcessorFactory': LanguageProcessorFactory,
+                'COMPRESSION_CHOICES': COMPRESSION_CHOICES,
+                'FORMAT_SUFFIXES': FORMAT_SUFFIXES,
+                'WorkLedger': WorkLedger,
+                'MetricsSnapshotWriter': MetricsSnapshotWriter,
+                'start_http_server': start_http_server,
                 'logger': logger
             })
-            print("✅ 使用相对导入")
+            print("✅ 使用相对导入", file=sys.stderr)
         except ImportError as e2:
-            print(f"相对导入也失败: {e2}")
+            print(f"相对导入也失败: {e2}", file=sys.stderr)
             raise ImportError("无法导入所需模块，请检查项目结构")
     
     return modules
@@ -56,64 +76,213 @@ try:
     modules = import_modules()
     BatchProcessor = modules['BatchProcessor']
     LanguageProcessorFactory = modules['LanguageProcessorFactory']
+    COMPRESSION_CHOICES = modules['COMPRESSION_CHOICES']
+    FORMAT_SUFFIXES = modules['FORMAT_SUFFIXES']
+    WorkLedger = modules['WorkLedger']
+    MetricsSnapshotWriter = modules['MetricsSnapshotWriter']
+    start_http_server = modules['start_http_server']
     logger = modules['logger']
 except ImportError as e:
-    print(f"模块导入失败: {e}")
+    print(f"模块导入失败: {e}", file=sys.stderr)
     raise
 
 @click.command(context_settings=dict(help_option_names=['-h', '--help']))
 @click.option('--input', '-i', 
               default=None,  # 允许None，稍后验证
-              help='Input directory or file path')
+              help='Input directory or file path ("-" reads stdin and writes to stdout)')
 @click.option('--language', '-l', default='auto', 
               type=click.Choice(['auto'] + LanguageProcessorFactory.get_supported_languages()),
               help='Language code (auto, zh, en, etc.)')
-@click.option('--workers', '-w', default=10, type=click.IntRange(1, 50), 
-              help='Number of worker threads (1-50)')
+@click.option('--workers', '-w', default='10',
+              help='Number of worker threads (1-50), or "auto" to tune executor and concurrency; '
+                   'pipe mode runs in-process unless set')
 @click.option('--files', '-f', help='Comma-separated file indices to process (e.g., "1,3,5")')
-def main(input: str, language: str, workers: int, files: str):
-    """Text Sanitizer CLI - Process JSON files with multilingual support"""
+@click.option('--output-format', default='pretty', type=click.Choice(['pretty', 'compact']),
+              help='Output JSON layout: indented (pretty) or minimal whitespace (compact)')
+@click.option('--compress', default='same', type=click.Choice(COMPRESSION_CHOICES),
+              help='Output compression (same: follow the input file)')
+@click.option('--shard', default=None,
+              help='Only process shard K of N, partitioned by path hash (e.g., "2/8")')
+@click.option('--ledger', default=None,
+              help='Shared SQLite ledger file; workers on all nodes claim files from it')
+@click.option('--worker-id', default=None, help='Worker name recorded in the ledger (default: host:pid)')
+@click.option('--lease', default=60.0, type=click.FloatRange(1, None),
+              help='Ledger lease duration in seconds')
+@click.option('--resume', is_flag=True,
+              help='Skip finished outputs and continue partial files from their last checkpoint')
+@click.option('--checkpoint-interval', default=30.0, type=click.FloatRange(0, None),
+              help='Seconds between checkpoints while streaming large files')
+@click.option('--formats', default='json,jsonl',
+              help=f'Comma-separated input formats to scan for ({",".join(FORMAT_SUFFIXES)})')
+@click.option('--columns', default=None,
+              help='CSV/TSV columns to sanitize, by header name or 1-based index (default: all)')
+@click.option('--no-header', is_flag=True, help='CSV/TSV files have no header row')
+@click.option('--stdin-format', default='jsonl', type=click.Choice(['jsonl', 'json', 'txt']),
+              help='Pipe mode (--input -): format of the data read from stdin')
+@click.option('--watch', is_flag=True,
+              help='Keep running and sanitize new files as they land in the input directory')
+@click.option('--debounce', default=0.5, type=click.FloatRange(0, None),
+              help='Watch mode: seconds a scanned file must stay unchanged before processing')
+@click.option('--prescan', is_flag=True,
+              help='Vectorized pre-scan to skip strings that need no changes (requires numpy)')
+@click.option('--metrics-port', default=None, type=click.IntRange(0, 65535),
+              help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics')
+@click.option('--metrics-file', default=None,
+              help='Periodically write Prometheus metrics snapshots to this file')
+@click.option('--metrics-interval', default=10.0, type=click.FloatRange(0.1, None),
+              help='Seconds between metrics snapshots')
+def main(input: str, language: str, workers: str, files: str, output_format: str,
+         compress: str, shard: str, ledger: str, worker_id: str, lease: float,
+         resume: bool, checkpoint_interval: float, formats: str, columns: str, no_header: bool,
+         stdin_format: str, watch: bool, debounce: float, prescan: bool, metrics_port: int,
+         metrics_file: str, metrics_interval: float):
+    """Text Sanitizer CLI - Process JSON/JSONL, CSV/TSV and text files (optionally compressed) with multilingual support"""
     
     # 参数验证和处理
     if input is None:
         # 如果没有提供input参数，使用当前目录
         input = '.'
-        print("⚠️  未指定输入路径，使用当前目录")
+        print("⚠️  未指定输入路径，使用当前目录", file=sys.stderr)
     
-    input_path = Path(input).resolve()
-    if not input_path.exists():
-        print(f"❌ 输入路径不存在: {input_path}")
-        raise click.BadParameter(f"Input path does not exist: {input_path}")
-    
-    print(f"📁 处理路径: {input_path}")
-    print(f"🌐 语言设置: {language}")
-    print(f"⚙️  工作线程: {workers}")
+    # 管道模式：从stdin读取，结果写到stdout，状态信息全部输出到stderr
+    pipe = input == '-'
+    if pipe:
+        if watch or ledger or files or shard or resume:
+            raise click.BadParameter("--input - cannot be combined with --watch, --ledger, "
+                                     "--files, --shard or --resume")
+        input_path = None
+        print(f"📁 处理路径: stdin ({stdin_format}) -> stdout", file=sys.stderr)
+    else:
+        input_path = Path(input).resolve()
+        if not input_path.exists():
+            print(f"❌ 输入路径不存在: {input_path}", file=sys.stderr)
+            raise click.BadParameter(f"Input path does not exist: {input_path}")
+        print(f"📁 处理路径: {input_path}", file=sys.stderr)
+
+    print(f"🌐 语言设置: {language}", file=sys.stderr)
+    # 解析工作线程数
+    if workers != 'auto':
+        try:
+            workers = int(workers)
+        except ValueError:
+            raise click.BadParameter("Workers must be an integer or 'auto'")
+        if not 1 <= workers <= 50:
+            raise click.BadParameter("Workers must be between 1 and 50")
+    if pipe and click.get_current_context().get_parameter_source('workers') \
+            == click.core.ParameterSource.DEFAULT:
+        # 管道模式默认在当前进程中清洗，显式指定 --workers 时才启用进程池
+        workers = 1
+    print(f"⚙️  工作线程: {workers}", file=sys.stderr)
+    print(f"📝 输出格式: {output_format}", file=sys.stderr)
+    print(f"🗜️  输出压缩: {compress}", file=sys.stderr)
+    if resume:
+        print("⏯️  续跑模式: 从检查点继续", file=sys.stderr)
+    if prescan:
+        print("🔎 预扫描: 跳过无需清洗的字符串", file=sys.stderr)
+    if watch:
+        if ledger or files or shard:
+            raise click.BadParameter("--watch cannot be combined with --ledger, --files or --shard")
+        if not input_path.is_dir():
+            raise click.BadParameter("--watch requires an input directory")
+        print("👀 监视模式: 持续处理新落地的文件 (Ctrl+C 停止)", file=sys.stderr)
     
     # 解析文件索引
     selected_indices = None
     if files:
         try:
             selected_indices = [int(x.strip()) for x in files.split(',')]
-            print(f"📄 指定文件索引: {selected_indices}")
+            print(f"📄 指定文件索引: {selected_indices}", file=sys.stderr)
         except ValueError:
-            print(f"❌ 文件索引格式错误: {files}")
+            print(f"❌ 文件索引格式错误: {files}", file=sys.stderr)
             raise click.BadParameter("Invalid file indices format")
     
+    # 解析输入格式与列选择
+    format_list = tuple(x.strip().lower() for x in formats.split(',') if x.strip())
+    unknown_formats = [x for x in format_list if x not in FORMAT_SUFFIXES]
+    if unknown_formats:
+        raise click.BadParameter(f"Unsupported formats: {','.join(unknown_formats)}")
+    print(f"📄 输入格式: {','.join(format_list)}", file=sys.stderr)
+    column_list = [x.strip() for x in columns.split(',')] if columns else None
+    if column_list:
+        print(f"📊 清洗列: {column_list}", file=sys.stderr)
+    
+    # 解析分片
+    shard_spec = None
+    if shard:
+        try:
+            shard_index, shard_count = (int(x) for x in shard.split('/'))
+        except ValueError:
+            raise click.BadParameter("Invalid shard format, expected K/N")
+        if not 1 <= shard_index <= shard_count:
+            raise click.BadParameter("Shard index must satisfy 1 <= K <= N")
+        shard_spec = (shard_index, shard_count)
+        print(f"🧩 分片: {shard_index}/{shard_count}", file=sys.stderr)
+    
+    # 启动指标导出
+    metrics_server = None
+    snapshot_writer = None
+    if metrics_port is not None:
+        metrics_server = start_http_server(metrics_port)
+        print(f"📈 指标服务: http://127.0.0.1:{metrics_server.server_address[1]}/metrics", file=sys.stderr)
+    if metrics_file:
+        snapshot_writer = MetricsSnapshotWriter(metrics_file, metrics_interval)
+        snapshot_writer.start()
+        print(f"📈 指标快照: {metrics_file}", file=sys.stderr)
+    
     try:
         # 创建批量处理器
-        processor = BatchProcessor(language_code=language, max_workers=workers)
+        processor = BatchProcessor(language_code=language, max_workers=workers,
+                                   output_format=output_format, compression=compress,
+                                   resume=resume, checkpoint_interval=checkpoint_interval,
+                                   formats=format_list, columns=column_list,
+                                   has_header=not no_header, prescan=prescan)
         
         # 处理文件
-        print("🚀 开始处理文件...")
-        success_count = processor.process_files(str(input_path), selected_indices)
+        if pipe:
+            try:
+                record_count = processor.process_pipe(sys.stdin.buffer, sys.stdout.buffer, stdin_format)
+            except BrokenPipeError:
+                # 下游已关闭管道（如 | head）：丢弃剩余输出，避免退出时刷新stdout再次报错，
+                # 并按SIGPIPE的惯例以 128+13 退出
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                logger.info("Downstream closed the pipe, stopping")
+                sys.exit(141)
+            print(f"\n✅ 处理完成!", file=sys.stderr)
+            print(f"   处理记录: {record_count} 条", file=sys.stderr)
+            return
         
-        print(f"\n✅ 处理完成!")
-        print(f"   成功处理: {success_count} 个文件")
+        print("🚀 开始处理文件...", file=sys.stderr)
+        if watch:
+            # 收到SIGINT/SIGTERM时停止接收新文件，等待处理中的文件完成后退出
+            stop_event = threading.Event()
+            previous_handlers = {sig: signal.signal(sig, lambda *_: stop_event.set())
+                                 for sig in (signal.SIGINT, signal.SIGTERM)}
+            try:
+                success_count = processor.process_watch(str(input_path), stop_event, debounce)
+            finally:
+                for sig, handler in previous_handlers.items():
+                    signal.signal(sig, handler)
+        elif ledger:
+            print(f"📒 任务账本: {ledger}", file=sys.stderr)
+            with WorkLedger(ledger, worker_id=worker_id, lease_seconds=lease) as work_ledger:
+                success_count = processor.process_ledger(str(input_path), work_ledger,
+                                                         selected_indices, shard_spec)
+        else:
+            success_count = processor.process_files(str(input_path), selected_indices, shard_spec)
+        
+        print(f"\n✅ 处理完成!", file=sys.stderr)
+        print(f"   成功处理: {success_count} 个文件", file=sys.stderr)
         
     except Exception as e:
-        print(f"❌ 处理过程中发生错误: {e}")
+        print(f"❌ 处理过程中发生错误: {e}", file=sys.stderr)
         logger.error(f"Processing failed: {e}")
         raise click.ClickException(f"Processing failed: {e}")
+    finally:
+        if snapshot_writer is not None:
+            snapshot_writer.stop()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+            metrics_server.server_close()
 
 # VSCode调试用的函数
 def run_with_args(args_list):
@@ -0,0 +1,171 @@
+import math
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ..utils.logger import logger
+
+# 预热阶段在当前线程中依次处理的最多文件数与时长（秒）
+WARMUP_FILES = 4
+WARMUP_SECONDS = 1.0
+
+# 规划时采样的文件数
+SIZE_SAMPLE = 1000
+
+# 线程模式的最大工作线程数，与手动设置的上限一致
+MAX_THREAD_WORKERS = 50
+
+# CPU时间占墙钟时间的比例达到该值时视为受GIL限制，多线程无法加速清洗
+CPU_BOUND_RATIO = 0.7
+
+# 预计剩余耗时低于该值（秒）时不值得启动进程池
+PROCESS_MIN_SECONDS = 5.0
+
+# 进程模式下每个任务的目标耗时（秒），小文件合并为一个任务以摊薄进程间通信
+TARGET_TASK_SECONDS = 0.25
+
+# 在途任务上限的调整周期（秒）
+ADJUST_INTERVAL = 2.0
+
+
+def get_file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def sample_sizes(files: Sequence[Path], limit: int = SIZE_SAMPLE) -> List[int]:
+    """等间隔采样文件大小，文件很多时避免逐个stat"""
+    if len(files) <= limit:
+        return [get_file_size(f) for f in files]
+    step = len(files) / limit
+    return [get_file_size(files[int(i * step)]) for i in range(limit)]
+
+
+class WarmupStats:
+    """预热阶段的耗时统计"""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, size: int, wall: float, cpu: float) -> None:
+        self.files += 1
+        self.bytes += size
+        self.wall += wall
+        self.cpu += cpu
+
+    @property
+    def cpu_ratio(self) -> float:
+        """CPU时间占墙钟时间的比例，越接近1越受CPU（GIL）限制"""
+        return self.cpu / self.wall if self.wall > 0 else 0.0
+
+    def seconds_per_file(self, mean_size: float) -> float:
+        """按预热吞吐量估算平均大小的文件所需时间"""
+        if not self.files:
+            return 0.0
+        if self.bytes and mean_size:
+            return self.wall / self.bytes * mean_size
+        return self.wall / self.files
+
+    def __str__(self) -> str:
+        return (f"{self.files} files, {self.bytes} bytes in {self.wall:.2f}s, "
+                f"cpu ratio {self.cpu_ratio:.2f}")
+
+
+class TuningPlan:
+    """
+    自动调优的执行方案
+
+    executor: 'thread' 或 'process'
+    workers: 工作线程/进程数
+    chunk_size: 每个任务包含的文件数
+    in_flight: 初始在途任务上限，运行中由InFlightController调整
+    """
+
+    def __init__(self, executor: str, workers: int, chunk_size: int = 1, in_flight: int = None):
+        self.executor = executor
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.in_flight = in_flight or workers
+
+    def __str__(self) -> str:
+        return (f"executor={self.executor} workers={self.workers} "
+                f"chunk_size={self.chunk_size} in_flight={self.in_flight}")
+
+
+def plan_tuning(sizes: Sequence[int], remaining_files: int, warmup: WarmupStats,
+                cpu_count: int = None) -> TuningPlan:
+    """
+    根据文件大小采样和预热统计选择执行方案
+
+    清洗受CPU限制且剩余工作量足以摊薄进程启动开销时使用进程池，
+    小文件按目标任务耗时合并；否则使用线程池，线程数按I/O等待占比放大
+    （CPU占比为r时约需1/r个线程才能占满一个核心）。
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if remaining_files <= 1:
+        return TuningPlan('thread', 1)
+
+    mean_size = sum(sizes) / len(sizes) if sizes else 0
+    per_file = warmup.seconds_per_file(mean_size)
+    estimated = per_file * remaining_files
+
+    if warmup.cpu_ratio >= CPU_BOUND_RATIO and cpu_count > 1 and estimated >= PROCESS_MIN_SECONDS:
+        workers = min(cpu_count, remaining_files)
+        chunk_size = int(TARGET_TASK_SECONDS / per_file) if per_file > 0 else 1
+        # 保证每个进程至少分到几个任务，避免尾部负载不均
+        chunk_size = max(1, min(chunk_size, remaining_files // (workers * 4)))
+        return TuningPlan('process', workers, chunk_size)
+
+    ratio = max(warmup.cpu_ratio, 1 / MAX_THREAD_WORKERS)
+    workers = max(1, min(math.ceil(1 / ratio), MAX_THREAD_WORKERS, remaining_files))
+    return TuningPlan('thread', workers)
+
+
+class InFlightController:
+    """
+    按观测吞吐量调整在途任务上限（爬山法）
+
+    每个周期比较完成的字节吞吐量，比上一周期好则沿当前方向继续调整，
+    变差则反向，上限始终在 [minimum, maximum] 之间。
+    """
+
+    def __init__(self, limit: int, minimum: int = 1, maximum: int = None,
+                 interval: float = ADJUST_INTERVAL):
+        self.minimum = minimum
+        self.maximum = maximum or limit
+        self.limit = max(minimum, min(limit, self.maximum))
+        self.interval = interval
+        self._direction = 1
+        self._last_rate: Optional[float] = None
+        self._window_bytes = 0
+        self._window_start = time.monotonic()
+
+    def record(self, nbytes: int, now: float = None) -> None:
+        """记录一个完成的任务，周期结束时调整上限"""
+        now = time.monotonic() if now is None else now
+        self._window_bytes += nbytes
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+
+        rate = self._window_bytes / elapsed
+        if self._last_rate is not None and rate < self._last_rate:
+            self._direction = -self._direction
+        step = max(1, self.limit // 4)
+        limit = max(self.minimum, min(self.limit + self._direction * step, self.maximum))
+        if limit == self.limit:
+            # 到达边界后下一周期朝另一方向试探
+            self._direction = -self._direction
+        else:
+            logger.info(f"Autotune: in-flight limit {self.limit} -> {limit} "
+                        f"({rate / 1e6:.2f} MB/s)")
+        self.limit = limit
+        self._last_rate = rate
+        self._window_bytes = 0
+        self._window_start = now
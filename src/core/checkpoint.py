@@ -0,0 +1,87 @@
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# 默认检查点间隔（秒）
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+
+
+def get_checkpoint_path(output_path: Union[str, Path]) -> Path:
+    """获取输出文件对应的检查点文件路径"""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}.ckpt")
+
+
+def get_source_signature(input_path: Union[str, Path]) -> Dict[str, int]:
+    """记录输入文件的大小和修改时间，用于判断续跑时输入是否发生变化"""
+    stat = Path(input_path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+# 校验 .part 文件时读取的检查点偏移之前的字节数
+PARTIAL_CHECK_BYTES = 1 << 16
+
+
+def get_partial_signature(partial_path: Union[str, Path], offset: int) -> Dict[str, int]:
+    """
+    记录 .part 文件的inode及偏移之前一段内容的CRC，用于确认检查点描述的就是这个临时文件
+
+    不带续跑重新运行时 .part 会被截断重写（inode不变），内容校验可以识别这种情况。
+    """
+    with open(partial_path, 'rb') as f:
+        start = max(0, offset - PARTIAL_CHECK_BYTES)
+        f.seek(start)
+        tail = f.read(offset - start)
+        return {'inode': os.fstat(f.fileno()).st_ino, 'crc32': zlib.crc32(tail)}
+
+
+class Checkpoint:
+    """
+    流式处理的检查点
+
+    input_offset: 已处理完的输入字节数（解压后的数据流偏移）
+    records: 已处理完的记录数
+    output_offset: 输出临时文件中可安全续写的字节偏移
+    source: 输入文件签名，见 get_source_signature
+    partial: 输出临时文件签名，见 get_partial_signature
+    """
+
+    def __init__(self, input_offset: int = 0, records: int = 0, output_offset: int = 0,
+                 source: Dict[str, int] = None, partial: Dict[str, int] = None):
+        self.input_offset = input_offset
+        self.records = records
+        self.output_offset = output_offset
+        self.source = source or {}
+        self.partial = partial or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'input_offset': self.input_offset,
+            'records': self.records,
+            'output_offset': self.output_offset,
+            'source': self.source,
+            'partial': self.partial,
+        }
+
+    def save(self, path: Union[str, Path]) -> None:
+        """原子地写入检查点文件"""
+        path = Path(path)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional['Checkpoint']:
+        """读取检查点文件，文件不存在或已损坏时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(data['input_offset'], data['records'], data['output_offset'],
+                       data.get('source'), data.get('partial'))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
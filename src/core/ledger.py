@@ -0,0 +1,191 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+from ..utils.logger import logger
+
+# 租约默认时长（秒），工作进程需在此时间内发送心跳，否则任务会被其他进程回收
+DEFAULT_LEASE_SECONDS = 60.0
+
+# 单个任务允许的最大认领次数，超过后标记为失败，避免问题文件反复拖垮工作进程
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    path TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL
+)
+'''
+
+
+def default_worker_id() -> str:
+    """生成默认的工作进程标识：主机名:进程号"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkLedger:
+    """
+    基于SQLite的共享任务账本
+
+    多个节点上的工作进程通过同一个账本文件认领任务。认领带有租约，
+    持有者通过心跳续约；进程崩溃后租约过期，任务会被其他进程重新认领。
+    所有写操作都在 BEGIN IMMEDIATE 事务中完成，同一时刻只有一个进程能认领成功。
+
+    注意：SQLite依赖文件锁，账本文件应放在支持POSIX锁的文件系统上；
+    租约基于各节点的系统时间，节点间时钟偏差应远小于租约时长。
+    """
+
+    def __init__(self, db_path: Union[str, Path], worker_id: str = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db_path = str(db_path)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE 写锁事务，异常时回滚"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def register(self, paths: Iterable[str]) -> int:
+        """登记任务，已存在的任务保持原状态，返回新增数量"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (path, updated) VALUES (?, ?)",
+                ((path, now) for path in paths),
+            )
+            return conn.total_changes - before
+
+    def claim(self) -> Optional[str]:
+        """认领一个待处理或租约已过期的任务，没有可认领任务时返回None"""
+        with self._transaction() as conn:
+            now = time.time()
+            # 超过最大尝试次数的过期任务直接标记为失败
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', owner = NULL, updated = ? "
+                "WHERE status = 'claimed' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT path FROM tasks WHERE status = 'pending' "
+                "OR (status = 'claimed' AND lease_expires < ?) ORDER BY rowid LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = 'claimed', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE path = ?",
+                (self.worker_id, now + self.lease_seconds, now, row[0]),
+            )
+            return row[0]
+
+    def heartbeat(self) -> int:
+        """为本进程持有的全部任务续约，返回续约数量"""
+        with self._transaction() as conn:
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? "
+                "WHERE owner = ? AND status = 'claimed'",
+                (now + self.lease_seconds, now, self.worker_id),
+            )
+            return cursor.rowcount
+
+    def complete(self, path: str, success: bool = True) -> bool:
+        """标记任务完成；若租约已被其他进程接管则返回False"""
+        status = 'done' if success else 'failed'
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE path = ? AND owner = ? AND status = 'claimed'",
+                (status, time.time(), path, self.worker_id),
+            )
+        if cursor.rowcount == 0:
+            self.logger.warning(f"Lease lost before completion: {path}")
+            return False
+        return True
+
+    def release(self, path: str) -> None:
+        """放弃任务，使其立即可被其他进程认领"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', owner = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated = ? "
+                "WHERE path = ? AND owner = ? AND status = 'claimed'",
+                (time.time(), path, self.worker_id),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """统计各状态的任务数量"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def start_heartbeat(self, interval: float = None) -> None:
+        """启动后台心跳线程，默认间隔为租约时长的三分之一"""
+        if self._heartbeat_thread is not None:
+            return
+        interval = interval or self.lease_seconds / 3
+
+        def beat():
+            while not self._heartbeat_stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Ledger heartbeat failed: {str(e)}")
+
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=beat, name='ledger-heartbeat',
+                                                  daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self) -> None:
+        """停止后台心跳线程"""
+        if self._heartbeat_thread is None:
+            return
+        self._heartbeat_stop.set()
+        self._heartbeat_thread.join()
+        self._heartbeat_thread = None
+
+    def close(self) -> None:
+        """停止心跳并关闭数据库连接"""
+        self.stop_heartbeat()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
@@ -0,0 +1,122 @@
+from typing import Dict, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖，未安装时不启用预扫描
+    np = None
+
+PRESCAN_AVAILABLE = np is not None
+
+# 分隔各字符串的码点，保证相邻判断（连续空格、None字面量）不会跨越字符串边界
+_SEPARATOR = '\x00'
+
+# 非ASCII码点的 (是否数字, 是否空白) 缓存
+_codepoint_cache: Dict[int, Tuple[bool, bool]] = {}
+
+
+def _classify_non_ascii(cp) -> Tuple['np.ndarray', 'np.ndarray']:
+    """按Unicode属性判断非ASCII码点是否为数字(\\d)或空白(\\s)"""
+    is_digit = np.zeros(cp.shape, dtype=bool)
+    is_space = np.zeros(cp.shape, dtype=bool)
+    non_ascii = cp > 0x7F
+    if not non_ascii.any():
+        return is_digit, is_space
+
+    unique, inverse = np.unique(cp[non_ascii], return_inverse=True)
+    flags = []
+    for value in unique.tolist():
+        flag = _codepoint_cache.get(value)
+        if flag is None:
+            char = chr(value)
+            flag = _codepoint_cache[value] = (char.isdecimal(), char.isspace())
+        flags.append(flag)
+    flags = np.array(flags, dtype=bool).reshape(-1, 2)
+    is_digit[non_ascii] = flags[inverse, 0]
+    is_space[non_ascii] = flags[inverse, 1]
+    return is_digit, is_space
+
+
+class PrescanResult:
+    """
+    一批字符串的预扫描结果，各数组按输入顺序与字符串一一对应
+
+    has_digit: 是否含数字（与正则 \\d 一致，含全角等Unicode数字）
+    needs_whitespace: 是否需要空白规整（非空格空白、连续空格或首尾空格）
+    has_quote: 是否含语言处理器需要保护的引号/书名号
+    has_none: 是否含 "None" 字面量（中文处理器会将其清除）
+    """
+
+    def __init__(self, has_digit, needs_whitespace, has_quote, has_none):
+        self.has_digit = has_digit
+        self.needs_whitespace = needs_whitespace
+        self.has_quote = has_quote
+        self.has_none = has_none
+
+    @property
+    def needs_processing(self) -> 'np.ndarray':
+        """清洗后可能发生变化的字符串；其余字符串可直接原样返回"""
+        return self.has_digit | self.needs_whitespace | self.has_quote | self.has_none
+
+
+def prescan_batch(texts: Sequence[str], quote_chars: str = '') -> PrescanResult:
+    """
+    向量化预扫描一批字符串
+
+    所有字符串以分隔符拼接后转为一个码点数组，通过少量数组运算和前缀和
+    得到每个字符串的各项标志，避免逐字符串调用正则。
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for prescan")
+
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    starts = np.zeros(len(texts), dtype=np.int64)
+    if len(texts) > 1:
+        starts[1:] = np.cumsum(lengths[:-1] + 1)
+    ends = starts + lengths
+
+    joined = _SEPARATOR.join(texts)
+    cp = np.frombuffer(joined.encode('utf-32-le', errors='surrogatepass'), dtype=np.uint32)
+    cp = cp.astype(np.int64)
+
+    def count(mask) -> 'np.ndarray':
+        prefix = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.cumsum(mask, out=prefix[1:])
+        return prefix[ends] - prefix[starts]
+
+    def pair_mask(first, second) -> 'np.ndarray':
+        # 位置i表示 (i, i+1) 相邻两码点，末尾补False保持长度一致
+        mask = np.zeros(len(cp), dtype=bool)
+        if len(cp) > 1:
+            mask[:-1] = first[:-1] & second[1:]
+        return mask
+
+    digit_other, space_other = _classify_non_ascii(cp)
+    is_digit = ((cp >= 0x30) & (cp <= 0x39)) | digit_other
+    is_ascii_space = (cp == 0x20)
+    is_space = ((cp >= 0x09) & (cp <= 0x0D)) | ((cp >= 0x1C) & (cp <= 0x20)) | space_other
+
+    # 空白规整：存在非空格空白、连续空格，或首尾为空白
+    non_empty = lengths > 0
+    edge_space = np.zeros(len(texts), dtype=bool)
+    if non_empty.any():
+        edge_space[non_empty] = is_space[starts[non_empty]] | is_space[ends[non_empty] - 1]
+    needs_whitespace = (count(is_space & ~is_ascii_space) > 0) \
+        | (count(pair_mask(is_ascii_space, is_ascii_space)) > 0) | edge_space
+
+    has_quote = np.zeros(len(texts), dtype=bool)
+    if quote_chars:
+        quote_mask = np.isin(cp, np.array([ord(c) for c in quote_chars], dtype=np.int64))
+        has_quote = count(quote_mask) > 0
+
+    none_mask = np.zeros(len(cp), dtype=bool)
+    if len(cp) >= 4:
+        none_mask[:-3] = (cp[:-3] == ord('N')) & (cp[1:-2] == ord('o')) \
+            & (cp[2:-1] == ord('n')) & (cp[3:] == ord('e'))
+    has_none = count(none_mask) > 0
+
+    return PrescanResult(
+        has_digit=count(is_digit) > 0,
+        needs_whitespace=needs_whitespace,
+        has_quote=has_quote,
+        has_none=has_none,
+    )
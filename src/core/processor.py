@@ -1,53 +1,302 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait,
+)
 from pathlib import Path
-from typing import List
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Set, Tuple, Union
 from tqdm import tqdm
-from ..utils.file_handler import load_json_file, save_json_file, select_files
+from ..utils.compression import detect_compression, get_suffix_compression, open_compressed
+from ..utils.delimited import (
+    DELIMITERS, format_rows, iter_row_batches, read_first_row, resolve_columns,
+)
+from ..utils.file_handler import (
+    DEFAULT_FORMATS, AtomicFileWriter, find_output_conflicts, get_file_format, get_output_path,
+    get_partial_path, get_relative_key, list_input_files, load_json_file, save_json_file,
+    select_files,
+)
+from ..utils.json_codec import get_codec
 from ..utils.logger import logger
+from ..utils.metrics import metrics
+from .autotune import (
+    MAX_THREAD_WORKERS, WARMUP_FILES, WARMUP_SECONDS, InFlightController, TuningPlan, WarmupStats,
+    get_file_size, plan_tuning, sample_sizes,
+)
+from .checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL, Checkpoint, get_checkpoint_path, get_partial_signature,
+    get_source_signature,
+)
+from .ledger import WorkLedger
 from .sanitizer import TextSanitizer
+from .streaming import PIPELINE_DEPTH, iter_available_lines, iter_line_batches, run_pipeline
+from .watcher import DEBOUNCE_SECONDS, POLL_INTERVAL, DirectoryWatcher
+
+_FILES = metrics.counter(
+    'batch_processor_files_total', 'Files finished, by outcome', ('status',))
+_FILES_IN_FLIGHT = metrics.gauge(
+    'batch_processor_files_in_flight', 'Files currently being processed')
+_FILE_LATENCY = metrics.histogram(
+    'batch_processor_file_seconds', 'Wall time spent per file')
+_RECORDS = metrics.counter(
+    'batch_processor_records_total', 'Records written (lines/rows for streamed files, 1 per JSON document)')
+_BYTES = metrics.counter(
+    'batch_processor_input_bytes_total', 'Input bytes consumed (decompressed for streamed files, on-disk size for JSON documents)')
+_LAST_PROGRESS = metrics.gauge(
+    'batch_processor_last_progress_timestamp_seconds', 'Unix time of the last completed batch or file')
 
 class BatchProcessor:
-    """批量处理JSON文件"""
+    """
+    批量处理JSON/JSONL、CSV/TSV及纯文本文件
+    
+    max_workers 为 'auto' 时根据预热测量自动选择线程/进程池、并发数和任务粒度。
+    """
     
-    def __init__(self, language_code: str = 'auto', max_workers: int = 10):
+    def __init__(self, language_code: str = 'auto', max_workers: Union[int, str] = 10,
+                 output_format: str = 'pretty', compression: str = 'same',
+                 resume: bool = False, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 formats: Tuple[str, ...] = None, columns: List[str] = None,
+                 has_header: bool = True, prescan: bool = False):
         self.language_code = language_code
         self.max_workers = max_workers
-        self.sanitizer = TextSanitizer(language_code)
+        self.output_format = output_format
+        self.compression = compression
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        self.formats = formats
+        self.columns = columns
+        self.has_header = has_header
+        self.prescan = prescan
+        self.codec = get_codec('auto')
+        self.sanitizer = TextSanitizer(language_code, prescan=prescan)
         self.logger = logger
     
     def process_single_file(self, input_path: Path, output_path: Path) -> bool:
         """处理单个文件"""
+        _FILES_IN_FLIGHT.inc()
+        start = time.perf_counter()
         try:
-            # 加载数据
-            data = load_json_file(input_path)
-            
-            # 清洗数据
-            processed_data = self.sanitizer.sanitize_json_data(data)
-            
-            # 保存数据
-            save_json_file(processed_data, output_path)
-            
+            status = 'success' if self._process_file(input_path, output_path) else 'skipped'
+            _FILES.labels(status).inc()
             return True
         except Exception as e:
+            _FILES.labels('failed').inc()
             self.logger.error(f"Failed to process file {input_path}: {str(e)}")
             return False
+        finally:
+            _FILES_IN_FLIGHT.dec()
+            _FILE_LATENCY.observe(time.perf_counter() - start)
+            _LAST_PROGRESS.set(time.time())
+    
+    def _process_file(self, input_path: Path, output_path: Path) -> bool:
+        """按文件格式分派处理，输出已存在而被跳过时返回False"""
+        # 输出文件通过原子替换生成，存在即表示已完整处理
+        if self.resume and output_path.exists():
+            self.logger.info(f"Output exists, skipping: {output_path}")
+            return False
+        
+        # 按行或按记录组织的格式走流式处理
+        file_format = get_file_format(input_path)
+        if file_format == 'jsonl':
+            self._process_stream_file(input_path, output_path, self._iter_line_batches,
+                                      self._sanitize_jsonl_lines)
+            return True
+        if file_format == 'txt':
+            self._process_stream_file(input_path, output_path, self._iter_line_batches,
+                                      self._sanitize_text_lines)
+            return True
+        if file_format in DELIMITERS:
+            self._process_delimited_file(input_path, output_path, DELIMITERS[file_format])
+            return True
+        
+        # 加载数据
+        data = load_json_file(input_path, self.codec)
+        
+        # 清洗数据
+        processed_data = self.sanitizer.sanitize_json_data(data)
+        
+        # 保存数据
+        save_json_file(processed_data, output_path, self.output_format, self.codec)
+        
+        _RECORDS.inc()
+        _BYTES.inc(input_path.stat().st_size)
+        return True
+    
+    def _sanitize_jsonl_lines(self, lines: List[bytes]) -> bytes:
+        """清洗一批JSONL行，输出为紧凑格式"""
+        records = [self.codec.loads(line) for line in lines if line.strip()]
+        sanitized = iter(self.sanitizer.sanitize_json_batch(records))
+        output = []
+        for line in lines:
+            if line.strip():
+                output.append(self.codec.dumps(next(sanitized), 'compact'))
+            output.append(b'\n')
+        return b''.join(output)
+    
+    def _sanitize_text_lines(self, lines: List[bytes]) -> bytes:
+        """逐行清洗纯文本，保留原有换行符，无法解码的字节原样保留"""
+        bodies = [line.rstrip(b'\r\n') for line in lines]
+        texts = [body.decode('utf-8', errors='surrogateescape') for body in bodies]
+        output = []
+        for line, body, text in zip(lines, bodies, self.sanitizer.sanitize_batch(texts)):
+            output.append(text.encode('utf-8', errors='surrogateescape'))
+            output.append(line[len(body):])
+        return b''.join(output)
+    
+    @staticmethod
+    def _iter_line_batches(src, input_offset: int) -> Iterator[Tuple[List[bytes], int]]:
+        """按批读取行，产出 (行列表, 本批消费的字节数)"""
+        for lines in iter_line_batches(src):
+            yield lines, sum(map(len, lines))
     
-    def process_files(self, input_path: str, selected_indices: List[int] = None) -> int:
+    def _process_delimited_file(self, input_path: Path, output_path: Path, delimiter: str) -> None:
+        """流式处理CSV/TSV文件，只清洗选中的列，表头原样保留"""
+        with open_compressed(input_path, 'rb', detect_compression(input_path)) as src:
+            first_row, line_terminator = read_first_row(src, delimiter)
+        columns = resolve_columns(self.columns, first_row if self.has_header else None)
+        header_pending = False
+        
+        def iter_batches(src, input_offset: int) -> Iterator[Tuple[List[List[str]], int]]:
+            nonlocal header_pending
+            # 在流水线启动前调用，从文件开头处理时第一条记录是表头
+            header_pending = self.has_header and input_offset == 0
+            return iter_row_batches(src, delimiter)
+        
+        def transform(rows: List[List[str]]) -> bytes:
+            nonlocal header_pending
+            start = 0
+            if header_pending:
+                header_pending = False
+                start = 1
+            cells = [(row, index) for row in rows[start:]
+                     for index in (range(len(row)) if columns is None else columns)
+                     if index < len(row)]
+            sanitized = self.sanitizer.sanitize_batch([row[index] for row, index in cells])
+            for (row, index), text in zip(cells, sanitized):
+                row[index] = text
+            return format_rows(rows, delimiter, line_terminator)
+        
+        self._process_stream_file(input_path, output_path, iter_batches, transform)
+    
+    def _load_checkpoint(self, input_path: Path, output_path: Path) -> Optional[Checkpoint]:
+        """读取可用于续跑的检查点，输入已变化或临时文件不完整时返回None"""
+        checkpoint = Checkpoint.load(get_checkpoint_path(output_path))
+        if checkpoint is None:
+            return None
+        
+        partial_path = get_partial_path(output_path)
+        if checkpoint.source != get_source_signature(input_path):
+            self.logger.warning(f"Input changed since last checkpoint, restarting: {input_path}")
+            return None
+        if not partial_path.exists() or partial_path.stat().st_size < checkpoint.output_offset:
+            self.logger.warning(f"Partial output missing or truncated, restarting: {partial_path}")
+            return None
+        if checkpoint.partial != get_partial_signature(partial_path, checkpoint.output_offset):
+            self.logger.warning(f"Partial output does not match checkpoint, restarting: {partial_path}")
+            return None
+        return checkpoint
+    
+    def _process_stream_file(self, input_path: Path, output_path: Path,
+                             iter_batches: Callable[[Any, int], Iterator[Tuple[Any, int]]],
+                             transform: Callable[[Any], bytes]) -> None:
+        """
+        流式处理按行或按记录组织的文件，解压、清洗、压缩在流水线中重叠执行
+        
+        iter_batches(src, input_offset) 产出 (记录批, 消费的字节数)，transform 将一批记录
+        转换为输出字节。每隔 checkpoint_interval 秒落盘一次输出并记录检查点；resume 模式下
+        从最近的检查点继续，已写出的记录不会重复处理。
+        """
+        checkpoint_path = get_checkpoint_path(output_path)
+        checkpoint = self._load_checkpoint(input_path, output_path) if self.resume else None
+        resume_offset = None
+        if checkpoint is not None:
+            resume_offset = checkpoint.output_offset
+            self.logger.info(f"Resuming {input_path} from record {checkpoint.records} "
+                             f"(input offset {checkpoint.input_offset})")
+        else:
+            # 从头处理会重写 .part，先删除旧检查点，避免之后续跑时用它截断新的临时文件
+            checkpoint_path.unlink(missing_ok=True)
+            checkpoint = Checkpoint(source=get_source_signature(input_path))
+        
+        last_checkpoint = time.monotonic()
+        
+        def process(batch: Tuple[Any, int]) -> Tuple[bytes, int, int]:
+            records, consumed = batch
+            return transform(records), consumed, len(records)
+        
+        def write(item: Tuple[bytes, int, int]) -> None:
+            nonlocal last_checkpoint
+            payload, consumed, count = item
+            writer.write(payload)
+            checkpoint.input_offset += consumed
+            checkpoint.records += count
+            _RECORDS.inc(count)
+            _BYTES.inc(consumed)
+            _LAST_PROGRESS.set(time.time())
+            if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                checkpoint.output_offset = writer.sync()
+                checkpoint.partial = get_partial_signature(writer.partial_path,
+                                                           checkpoint.output_offset)
+                checkpoint.save(checkpoint_path)
+                last_checkpoint = time.monotonic()
+        
+        with open_compressed(input_path, 'rb', detect_compression(input_path)) as src, \
+                AtomicFileWriter(output_path, get_suffix_compression(output_path),
+                                 resume_offset) as writer:
+            if checkpoint.input_offset:
+                src.seek(checkpoint.input_offset)
+            run_pipeline(iter_batches(src, checkpoint.input_offset), process, write)
+        
+        checkpoint_path.unlink(missing_ok=True)
+        self.logger.info(f"Successfully saved file: {output_path} ({checkpoint.records} records)")
+    
+    def _select_files(self, input_path: str, selected_indices: List[int] = None,
+                      shard: Tuple[int, int] = None) -> List[Path]:
+        """
+        选择要处理的文件，排除输出路径相同的输入文件，避免写同一个输出文件相互覆盖
+        
+        冲突在分片和 --files 选择之前的完整输入列表上检查：同名的 a.json 与 a.json.gz
+        可能落在不同分片，由不同节点分别处理。
+        """
+        candidates = list_input_files(input_path, self.formats)
+        files = select_files(input_path, selected_indices, shard, files=candidates)
+        conflicts = find_output_conflicts(candidates, self.compression)
+        if not conflicts:
+            return files
+        
+        selected = set(files)
+        excluded = set()
+        for output_path, inputs in conflicts.items():
+            skipped = [f for f in inputs if f in selected]
+            if not skipped:
+                continue
+            self.logger.error(f"Skipping {len(skipped)} inputs that would write {output_path} "
+                              f"together with other inputs: {', '.join(str(f) for f in inputs)}")
+            excluded.update(skipped)
+            _FILES.labels('failed').inc(len(skipped))
+        return [f for f in files if f not in excluded]
+    
+    def process_files(self, input_path: str, selected_indices: List[int] = None,
+                      shard: Tuple[int, int] = None) -> int:
         """批量处理文件"""
         try:
-            files = select_files(input_path, selected_indices)
+            files = self._select_files(input_path, selected_indices, shard)
             if not files:
                 self.logger.warning("No files to process")
                 return 0
             
+            if self.max_workers == 'auto':
+                return self._process_files_auto(files)
+            
             success_count = 0
             
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 # 创建任务
                 futures = {}
                 for json_file in files:
-                    output_file = json_file.with_name(f"{json_file.stem}_p.json")
+                    output_file = get_output_path(json_file, self.compression)
                     future = executor.submit(self.process_single_file, json_file, output_file)
                     futures[future] = json_file
                 
@@ -71,4 +320,330 @@ class BatchProcessor:
             
         except Exception as e:
             self.logger.error(f"Batch processing failed: {str(e)}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    def _process_files_auto(self, files: List[Path]) -> int:
+        """
+        自动调优模式下批量处理文件
+        
+        先在当前线程中依次处理前几个文件作为预热，测量墙钟时间与CPU时间，
+        再结合剩余文件的大小采样选择执行方案；运行中按吞吐量调整在途任务上限。
+        """
+        success_count = 0
+        with tqdm(total=len(files), desc="Processing files") as pbar:
+            warmup = WarmupStats()
+            pending = list(files)
+            while pending and warmup.files < WARMUP_FILES and warmup.wall < WARMUP_SECONDS:
+                json_file = pending.pop(0)
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                success = self.process_single_file(json_file, get_output_path(json_file, self.compression))
+                warmup.add(get_file_size(json_file), time.perf_counter() - wall_start,
+                           time.process_time() - cpu_start)
+                success_count += self._report_result(json_file, success)
+                pbar.update(1)
+            
+            if pending:
+                plan = plan_tuning(sample_sizes(pending), len(pending), warmup)
+                self.logger.info(f"Autotune plan: {plan} (warm-up: {warmup})")
+                success_count += self._run_plan(pending, plan, pbar)
+        
+        self.logger.info(f"Batch processing completed. Success: {success_count}/{len(files)}")
+        return success_count
+    
+    def _run_plan(self, files: List[Path], plan: TuningPlan, pbar: tqdm) -> int:
+        """
+        按执行方案分块提交文件，在途任务数由InFlightController控制
+        
+        线程按需创建，在途任务上限即实际并发的线程数，可在方案线程数的两倍以内增减；
+        进程池大小固定，上限不超过进程数，只起限流作用。
+        """
+        if plan.executor == 'process':
+            maximum = plan.workers
+            executor = ProcessPoolExecutor(max_workers=plan.workers, initializer=_init_worker,
+                                           initargs=(self._worker_config(),))
+            run_chunk = _process_chunk_in_worker
+        else:
+            maximum = min(plan.workers * 2, MAX_THREAD_WORKERS)
+            executor = ThreadPoolExecutor(max_workers=maximum)
+            run_chunk = self._process_chunk
+        
+        controller = InFlightController(plan.in_flight, maximum=maximum)
+        chunks = iter([files[i:i + plan.chunk_size] for i in range(0, len(files), plan.chunk_size)])
+        success_count = 0
+        with executor:
+            futures = {}
+            while True:
+                while len(futures) < controller.limit:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    futures[executor.submit(run_chunk, chunk)] = chunk
+                    if plan.executor == 'process':
+                        _FILES_IN_FLIGHT.inc(len(chunk))
+                
+                if not futures:
+                    break
+                
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = futures.pop(future)
+                    try:
+                        results = future.result()
+                        if plan.executor == 'process':
+                            # 工作进程中记录的指标随结果返回，在主进程中合并后导出
+                            results, samples = results
+                            metrics.merge(samples)
+                    except Exception as e:
+                        self.logger.error(f"Exception processing {len(chunk)} files from {chunk[0]}: {str(e)}")
+                        results = [False] * len(chunk)
+                    if plan.executor == 'process':
+                        _FILES_IN_FLIGHT.dec(len(chunk))
+                        _LAST_PROGRESS.set(time.time())
+                    for json_file, success in zip(chunk, results):
+                        success_count += self._report_result(json_file, success)
+                    controller.record(sum(get_file_size(f) for f in chunk))
+                    pbar.update(len(chunk))
+        
+        self.logger.info(f"Autotune finished with in-flight limit {controller.limit}")
+        return success_count
+    
+    def _process_chunk(self, files: List[Path]) -> List[bool]:
+        """依次处理一组文件"""
+        return [self.process_single_file(f, get_output_path(f, self.compression)) for f in files]
+    
+    def _report_result(self, json_file: Path, success: bool) -> bool:
+        if success:
+            self.logger.info(f"Successfully processed: {json_file}")
+        else:
+            self.logger.error(f"Failed to process: {json_file}")
+        return success
+    
+    def _worker_config(self) -> dict:
+        """在工作进程中重建处理器所需的参数"""
+        return dict(language_code=self.language_code, max_workers=1,
+                    output_format=self.output_format, compression=self.compression,
+                    resume=self.resume, checkpoint_interval=self.checkpoint_interval,
+                    formats=self.formats, columns=self.columns, has_header=self.has_header,
+                    prescan=self.prescan)
+    
+    def process_ledger(self, input_path: str, ledger: WorkLedger,
+                       selected_indices: List[int] = None, shard: Tuple[int, int] = None) -> int:
+        """
+        通过共享账本认领并处理文件（work-stealing模式）
+        
+        各节点登记同一批文件，然后循环认领、处理、标记完成。本节点没有可认领的任务时，
+        只要账本中仍有其他进程持有的任务就继续等待，以便接管崩溃进程留下的文件。
+        """
+        root = Path(input_path)
+        try:
+            files = self._select_files(input_path, selected_indices, shard)
+            added = ledger.register(get_relative_key(f, root) for f in files)
+            self.logger.info(f"Registered {added} new files in ledger {ledger.db_path}")
+            
+            success_count = 0
+            poll_interval = min(ledger.lease_seconds / 4, 5.0)
+            ledger.start_heartbeat()
+            
+            # 账本模式逐个认领文件，自动调优时只按吞吐量调整并发的线程数
+            controller = None
+            workers = self.max_workers
+            if workers == 'auto':
+                workers = MAX_THREAD_WORKERS
+                controller = InFlightController(os.cpu_count() or 1, maximum=workers)
+                self.logger.info(f"Autotune: ledger mode with up to {workers} threads, "
+                                 f"starting at {controller.limit}")
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor, \
+                    tqdm(desc="Processing files") as pbar:
+                futures = {}
+                while True:
+                    # 补充任务直到占满工作线程
+                    while len(futures) < (controller.limit if controller else workers):
+                        key = ledger.claim()
+                        if key is None:
+                            break
+                        json_file = root / key if root.is_dir() else root
+                        output_file = get_output_path(json_file, self.compression)
+                        future = executor.submit(self.process_single_file, json_file, output_file)
+                        futures[future] = key
+                    
+                    if not futures:
+                        if not ledger.stats().get('claimed'):
+                            break
+                        # 其他进程仍持有任务，等待其完成或租约过期
+                        time.sleep(poll_interval)
+                        continue
+                    
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = futures.pop(future)
+                        success = future.result()
+                        if controller:
+                            controller.record(get_file_size(root / key if root.is_dir() else root))
+                        if ledger.complete(key, success) and success:
+                            success_count += 1
+                            self.logger.info(f"Successfully processed: {key}")
+                        elif not success:
+                            self.logger.error(f"Failed to process: {key}")
+                        pbar.update(1)
+            
+            self.logger.info(f"Ledger processing completed. Success: {success_count}, "
+                             f"ledger status: {ledger.stats()}")
+            return success_count
+            
+        except Exception as e:
+            self.logger.error(f"Ledger processing failed: {str(e)}")
+            return 0
+        finally:
+            ledger.stop_heartbeat()
+    
+    def _output_is_current(self, input_path: Path) -> bool:
+        """输出文件存在且不早于输入文件"""
+        try:
+            output_stat = get_output_path(input_path, self.compression).stat()
+            return output_stat.st_mtime_ns >= input_path.stat().st_mtime_ns
+        except OSError:
+            return False
+    
+    def process_watch(self, input_path: str, stop_event: threading.Event,
+                      debounce: float = DEBOUNCE_SECONDS, poll_interval: float = POLL_INTERVAL,
+                      use_inotify: bool = None) -> int:
+        """
+        持续监视目录，文件写入完成后立即清洗，直到stop_event被设置
+        
+        整个运行期间复用同一个处理器（语言处理器保持预热），同时处理的文件数不超过
+        max_workers。启动时先处理尚无最新输出的已有文件；文件在处理过程中再次落地时，
+        当前处理完成后重新处理一次。停止时不再接收新文件，等待处理中的文件完成。
+        """
+        root = Path(input_path)
+        if not root.is_dir():
+            raise ValueError(f"Watch mode requires a directory: {root}")
+        workers = (os.cpu_count() or 1) if self.max_workers == 'auto' else self.max_workers
+        
+        success_count = 0
+        queued = deque()
+        queued_set = set()
+        running = {}
+        rerun = set()
+        
+        def reap(futures) -> None:
+            nonlocal success_count
+            for future in futures:
+                json_file = running.pop(future)
+                success_count += self._report_result(json_file, future.result())
+                if json_file in rerun:
+                    rerun.discard(json_file)
+                    queued.append(json_file)
+                    queued_set.add(json_file)
+        
+        with DirectoryWatcher(root, self.formats or DEFAULT_FORMATS, debounce, poll_interval,
+                              use_inotify, self._output_is_current) as watcher, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            self.logger.info(f"Watching {root} ({watcher.backend}) with {workers} workers")
+            while not stop_event.is_set():
+                # 等待处理槽位时缩短等待，以便尽快提交排队的文件
+                timeout = 0.01 if queued else None
+                for json_file in watcher.poll(timeout):
+                    if json_file in running.values():
+                        rerun.add(json_file)
+                    elif json_file not in queued_set:
+                        queued.append(json_file)
+                        queued_set.add(json_file)
+                
+                reap([future for future in running if future.done()])
+                while queued and len(running) < workers:
+                    json_file = queued.popleft()
+                    queued_set.discard(json_file)
+                    output_file = get_output_path(json_file, self.compression)
+                    running[executor.submit(self.process_single_file, json_file, output_file)] = json_file
+            
+            self.logger.info(f"Stopping watch, waiting for {len(running)} files in progress "
+                             f"({len(queued)} queued files dropped)")
+            rerun.clear()
+            reap(list(as_completed(running)))
+        
+        self.logger.info(f"Watch stopped. Success: {success_count}")
+        return success_count
+    
+    def process_pipe(self, src: BinaryIO, dst: BinaryIO, input_format: str = 'jsonl') -> int:
+        """
+        从管道读取数据，清洗后写到管道，返回处理的记录数
+        
+        JSONL和纯文本按数据到达情况分批清洗，每批写出后立即flush：输入缓慢时逐条输出，
+        输入密集时自动合并为大批次；不完整的行等到换行符到达或输入结束后才处理。
+        读取、清洗、写出在流水线中重叠，预读量受流水线深度限制。max_workers大于1时
+        各批交给进程池并行清洗，写出顺序与输入一致。JSON文档需读完整个输入后处理。
+        下游关闭管道时抛出BrokenPipeError，由调用方处理。
+        """
+        if input_format == 'json':
+            data = self.sanitizer.sanitize_json_data(self.codec.loads(src.read()))
+            dst.write(self.codec.dumps(data, self.output_format) + b'\n')
+            dst.flush()
+            _RECORDS.inc()
+            return 1
+        
+        sanitize_lines = self._sanitize_jsonl_lines if input_format == 'jsonl' else self._sanitize_text_lines
+        cpu_count = os.cpu_count() or 1
+        workers = cpu_count if self.max_workers == 'auto' else min(self.max_workers, cpu_count)
+        executor = None
+        if workers > 1:
+            # 清洗受GIL限制，多线程无法加速，并行时使用进程池
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(self._worker_config(),))
+        self.logger.info(f"Pipe mode: format={input_format} workers={workers}")
+        records = 0
+        # 已提交但尚未写出的任务，异常退出时取消
+        pending: Set[Future] = set()
+        
+        def process(lines: List[bytes]) -> Tuple[Any, int, int]:
+            if executor is None:
+                payload = sanitize_lines(lines)
+            else:
+                payload = executor.submit(_sanitize_lines_in_worker, input_format, lines)
+                pending.add(payload)
+            return payload, sum(map(len, lines)), len(lines)
+        
+        def write(item: Tuple[Any, int, int]) -> None:
+            nonlocal records
+            payload, consumed, count = item
+            if isinstance(payload, Future):
+                pending.discard(payload)
+                # 工作进程中记录的清洗指标随结果返回，在主进程中合并后导出
+                payload, samples = payload.result()
+                metrics.merge(samples)
+            dst.write(payload)
+            dst.flush()
+            records += count
+            _RECORDS.inc(count)
+            _BYTES.inc(consumed)
+            _LAST_PROGRESS.set(time.time())
+        
+        try:
+            run_pipeline(iter_available_lines(src), process, write,
+                         depth=max(PIPELINE_DEPTH, workers * 2))
+        finally:
+            if executor is not None:
+                # shutdown(cancel_futures=True) 需要Python 3.9+，这里手动取消
+                for future in pending:
+                    future.cancel()
+                executor.shutdown()
+        return records
+
+# 进程池模式下每个工作进程持有的处理器，由初始化函数创建并在整个进程生命周期内复用
+_worker_processor: Optional[BatchProcessor] = None
+
+def _init_worker(config: dict) -> None:
+    global _worker_processor
+    _worker_processor = BatchProcessor(**config)
+    # fork启动的进程继承了主进程当时的指标值，清零后只上报本进程产生的增量
+    metrics.drain()
+
+def _process_chunk_in_worker(files: List[Path]) -> Tuple[List[bool], dict]:
+    return _worker_processor._process_chunk(files), metrics.drain()
+
+def _sanitize_lines_in_worker(input_format: str, lines: List[bytes]) -> Tuple[bytes, dict]:
+    if input_format == 'jsonl':
+        payload = _worker_processor._sanitize_jsonl_lines(lines)
+    else:
+        payload = _worker_processor._sanitize_text_lines(lines)
+    return payload, metrics.drain()
\ No newline at end of file
@@ -1,15 +1,33 @@
 import logging
+import time
 from typing import Any, Dict, List, Union
 from ..languages.factory import LanguageProcessorFactory
 from ..utils.logger import logger
+from ..utils.metrics import metrics
+from .prescan import PRESCAN_AVAILABLE, prescan_batch
+
+_STRING_ERRORS = metrics.counter(
+    'text_sanitizer_errors_total', 'Strings whose sanitization raised an error', ('language',))
+# 直方图的 _count 为各语言经处理器清洗的字符串数，预扫描跳过的字符串
+# 不经过处理器，单独计入 text_sanitizer_prescan_skipped_total
+_STRING_LATENCY = metrics.histogram(
+    'text_sanitizer_latency_seconds', 'Per-string sanitization latency', ('language',))
+_PROCESSOR_CACHE = metrics.counter(
+    'text_sanitizer_processor_cache_total', 'Language processor cache lookups', ('result',))
+_PRESCAN_SKIPPED = metrics.counter(
+    'text_sanitizer_prescan_skipped_total', 'Strings returned unchanged by the vectorized prescan')
 
 class TextSanitizer:
     """文本清洗器主类"""
     
-    def __init__(self, language_code: str = 'auto'):
+    def __init__(self, language_code: str = 'auto', prescan: bool = False):
         self.language_code = language_code
         self.processor = None
         self.logger = logger
+        
+        if prescan and not PRESCAN_AVAILABLE:
+            self.logger.warning("NumPy is not installed, prescan disabled")
+        self.prescan = prescan and PRESCAN_AVAILABLE
     
     def _detect_language(self, text: str) -> str:
         """检测文本语言"""
@@ -28,7 +46,10 @@ class TextSanitizer:
         else:
             language_code = self.language_code
         
-        if not self.processor or self.processor.code != language_code:
+        if self.processor and self.processor.code == language_code:
+            _PROCESSOR_CACHE.labels('hit').inc()
+        else:
+            _PROCESSOR_CACHE.labels('miss').inc()
             try:
                 self.processor = LanguageProcessorFactory.create_processor(language_code)
                 self.logger.info(f"Created processor for language: {language_code}")
@@ -44,10 +65,73 @@ class TextSanitizer:
             return ""
         
         processor = self._get_processor(text)
-        return processor.sanitize_text(text)
+        start = time.perf_counter()
+        try:
+            return processor.sanitize_text(text)
+        except Exception:
+            _STRING_ERRORS.labels(processor.code).inc()
+            raise
+        finally:
+            _STRING_LATENCY.labels(processor.code).observe(time.perf_counter() - start)
+    
+    def sanitize_batch(self, texts: List[str]) -> List[str]:
+        """
+        批量清洗文本
+        
+        启用预扫描时，先对整批字符串做一次向量化扫描：不含数字、引号、多余空白等
+        可能被改写内容的字符串直接原样返回，其余字符串按原流程逐条清洗（包括自动
+        语言模式下的语言检测），因此输出与不启用预扫描时完全一致。
+        """
+        if not self.prescan or not texts:
+            return [self.sanitize_text(text) for text in texts]
+        
+        scan = prescan_batch(texts, LanguageProcessorFactory.get_protected_chars())
+        needs_processing = scan.needs_processing.tolist()
+        
+        results = list(texts)
+        for i, text in enumerate(texts):
+            if needs_processing[i]:
+                results[i] = self.sanitize_text(text)
+        _PRESCAN_SKIPPED.inc(len(texts) - sum(needs_processing))
+        return results
+    
+    def sanitize_json_batch(self, records: List[Any]) -> List[Any]:
+        """批量清洗多条JSON数据，所有字符串合并为一批处理"""
+        if not self.prescan:
+            return [self.sanitize_json_data(record) for record in records]
+        
+        strings = []
+        self._collect_strings(records, strings)
+        sanitized = iter(self.sanitize_batch(strings))
+        return [self._replace_strings(record, sanitized) for record in records]
+    
+    def _collect_strings(self, data: Any, strings: List[str]) -> None:
+        """按遍历顺序收集JSON数据中的所有字符串值"""
+        if isinstance(data, dict):
+            for value in data.values():
+                self._collect_strings(value, strings)
+        elif isinstance(data, list):
+            for item in data:
+                self._collect_strings(item, strings)
+        elif isinstance(data, str):
+            strings.append(data)
+    
+    def _replace_strings(self, data: Any, sanitized: Any) -> Any:
+        """按相同遍历顺序用清洗结果替换字符串值"""
+        if isinstance(data, dict):
+            return {k: self._replace_strings(v, sanitized) for k, v in data.items()}
+        elif isinstance(data, list):
+            return [self._replace_strings(item, sanitized) for item in data]
+        elif isinstance(data, str):
+            return next(sanitized)
+        else:
+            return data
     
     def sanitize_json_data(self, data: Any) -> Any:
         """递归清洗JSON数据中的所有字符串"""
+        if self.prescan:
+            return self.sanitize_json_batch([data])[0]
+        
         if isinstance(data, dict):
             return {k: self.sanitize_json_data(v) for k, v in data.items()}
         elif isinstance(data, list):
@@ -0,0 +1,108 @@
+import io
+import queue
+import threading
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List
+
+# 每批读取的数据量（字节），用于摊薄线程间传递的开销
+BATCH_BYTES = 1 << 20
+
+# 读取、处理、写入各阶段之间允许积压的批次数
+PIPELINE_DEPTH = 4
+
+_SENTINEL = object()
+
+
+def iter_line_batches(stream: BinaryIO, batch_bytes: int = BATCH_BYTES) -> Iterator[List[bytes]]:
+    """按批读取二进制流中的行，每行保留原始换行符"""
+    while True:
+        lines = stream.readlines(batch_bytes)
+        if not lines:
+            return
+        yield lines
+
+
+def iter_available_lines(stream: BinaryIO, batch_bytes: int = BATCH_BYTES) -> Iterator[List[bytes]]:
+    """
+    按数据到达情况分批产出完整的行，用于管道等持续输入的流
+
+    read1只等待一次底层读取，输入缓慢时每批只有刚到达的一两行，输入密集时批次自动变大。
+    末尾不完整的行留到下一批拼接，流结束时作为最后一行产出。
+    """
+    pending = b''
+    while True:
+        chunk = stream.read1(batch_bytes)
+        if not chunk:
+            if pending:
+                yield [pending]
+            return
+        data = pending + chunk
+        end = data.rfind(b'\n') + 1
+        pending = data[end:]
+        if end:
+            yield io.BytesIO(data[:end]).readlines()
+
+
+def run_pipeline(batches: Iterable[Any], transform: Callable[[Any], Any],
+                 write: Callable[[Any], None], depth: int = PIPELINE_DEPTH) -> None:
+    """
+    三段式流水线：读取线程 -> 当前线程处理 -> 写入线程
+
+    解压和压缩在独立线程中进行（zlib/bz2/lzma在工作时会释放GIL），
+    使读取、清洗、写入相互重叠。任一阶段出错时其余阶段会尽快停止，
+    并在当前线程中重新抛出第一个异常。
+    """
+    in_queue = queue.Queue(maxsize=depth)
+    out_queue = queue.Queue(maxsize=depth)
+    errors = []
+    stop = threading.Event()
+
+    def read_all():
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    break
+                in_queue.put(batch)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            in_queue.put(_SENTINEL)
+
+    def write_all():
+        while True:
+            item = out_queue.get()
+            if item is _SENTINEL:
+                return
+            if stop.is_set():
+                continue
+            try:
+                write(item)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+    reader = threading.Thread(target=read_all, name='pipeline-reader', daemon=True)
+    writer = threading.Thread(target=write_all, name='pipeline-writer', daemon=True)
+    reader.start()
+    writer.start()
+
+    try:
+        while True:
+            batch = in_queue.get()
+            if batch is _SENTINEL:
+                break
+            if stop.is_set():
+                continue
+            out_queue.put(transform(batch))
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+        while in_queue.get() is not _SENTINEL:
+            pass
+    finally:
+        out_queue.put(_SENTINEL)
+        reader.join()
+        writer.join()
+
+    if errors:
+        raise errors[0]
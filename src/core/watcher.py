@@ -0,0 +1,249 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ..utils.file_handler import is_processed_file, is_supported_file
+from ..utils.logger import logger
+
+# 文件大小和修改时间保持不变多久（秒）后视为写入完成，仅用于扫描发现的文件
+DEBOUNCE_SECONDS = 0.5
+
+# 轮询模式的扫描间隔（秒）
+POLL_INTERVAL = 0.25
+
+# 目录修改时间距今小于该值（秒）时总是重新列出，避免粗粒度时间戳漏掉同一时刻新建的文件
+_RECENT_DIR_SECONDS = 2.0
+
+# inotify 事件掩码，见 <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None and sys.platform.startswith('linux'):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            _libc = libc
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+def inotify_available() -> bool:
+    """当前平台是否可以通过libc使用inotify"""
+    return _load_libc() is not None
+
+
+def get_file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _Inotify:
+    """基于ctypes的最小inotify封装，按目录递归添加监视"""
+
+    def __init__(self):
+        libc = _load_libc()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._libc = libc
+        self._dirs: Dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {directory}: {os.strerror(errno)}")
+        self._dirs[wd] = directory
+
+    def read(self, timeout: float) -> List[Tuple[Optional[Path], int]]:
+        """等待并读取事件，返回 (路径, 掩码) 列表；队列溢出时路径为None"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, mask))
+            elif mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+            elif wd in self._dirs and name:
+                events.append((self._dirs[wd] / os.fsdecode(name), mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    监视目录中新落地的数据文件
+
+    优先使用inotify：文件关闭写入(IN_CLOSE_WRITE)或被移入(IN_MOVED_TO)时立即就绪。
+    不可用时退化为轮询：只重新列出修改时间变化的目录，按inode识别新文件和被替换的文件，
+    其大小和修改时间在debounce秒内不再变化后才视为写入完成。原地改写已有文件
+    不会改变目录，轮询模式下不会被发现。
+
+    启动时、发现新子目录或inotify队列溢出时通过扫描补齐文件，扫描到的文件同样经过
+    去抖，并由is_current过滤掉已有最新输出的文件。
+    """
+
+    def __init__(self, root: Union[str, Path], formats: Tuple[str, ...],
+                 debounce: float = DEBOUNCE_SECONDS, poll_interval: float = POLL_INTERVAL,
+                 use_inotify: bool = None, is_current: Callable[[Path], bool] = None):
+        self.root = Path(root)
+        self.formats = formats
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.is_current = is_current
+        # 目录 -> 修改时间，目录 -> {文件名: inode}
+        self._dirs: Dict[Path, int] = {}
+        self._entries: Dict[Path, Dict[str, int]] = {}
+        # 待定文件 -> (上次观察到的大小和修改时间, 开始稳定的时刻)
+        self._pending: Dict[Path, Tuple[Optional[Tuple[int, int]], float]] = {}
+        self._inotify: Optional[_Inotify] = None
+
+        if use_inotify is None:
+            use_inotify = inotify_available()
+        if use_inotify:
+            self._inotify = _Inotify()
+        self.backend = 'inotify' if self._inotify else 'polling'
+        self._scan(self.root)
+
+    def _accept(self, path: Path) -> bool:
+        return is_supported_file(path, self.formats) and not is_processed_file(path)
+
+    def _scan(self, directory: Path) -> None:
+        """列出目录（递归进入新的子目录），新出现或被替换的文件进入去抖队列"""
+        try:
+            self._dirs[directory] = directory.stat().st_mtime_ns
+            if self._inotify:
+                self._inotify.add_watch(directory)
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f"Cannot scan {directory}: {str(e)}")
+            self._dirs.pop(directory, None)
+            self._entries.pop(directory, None)
+            return
+
+        known = self._entries.get(directory, {})
+        current = {}
+        for entry in entries:
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                if path not in self._dirs:
+                    self._scan(path)
+            elif self._accept(path) and entry.is_file():
+                # DirEntry.inode() 来自目录项本身，无需额外的stat调用
+                current[entry.name] = entry.inode()
+                if known.get(entry.name) != current[entry.name]:
+                    self._pending[path] = (None, time.monotonic())
+        self._entries[directory] = current
+
+    def _rescan_changed_dirs(self) -> None:
+        now_ns = time.time_ns()
+        for directory, mtime_ns in list(self._dirs.items()):
+            try:
+                current = directory.stat().st_mtime_ns
+            except OSError:
+                self._dirs.pop(directory, None)
+                self._entries.pop(directory, None)
+                continue
+            if current != mtime_ns or now_ns - current < _RECENT_DIR_SECONDS * 1e9:
+                self._scan(directory)
+
+    def _settled(self) -> List[Path]:
+        """返回大小和修改时间已稳定的待定文件"""
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self._pending.items()):
+            current = get_file_signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                self._pending[path] = (current, now)
+            elif now - since >= self.debounce:
+                del self._pending[path]
+                if self.is_current is None or not self.is_current(path):
+                    ready.append(path)
+        return ready
+
+    def _record(self, path: Path) -> None:
+        """记录inotify报告的文件，避免之后的扫描重复发现"""
+        try:
+            self._entries.setdefault(path.parent, {})[path.name] = path.stat().st_ino
+        except OSError:
+            pass
+
+    def poll(self, timeout: float = None) -> List[Path]:
+        """等待最多timeout秒，返回已写入完成、需要处理的文件"""
+        if timeout is None:
+            timeout = self.poll_interval
+        if self._pending:
+            timeout = min(timeout, self.debounce / 2)
+
+        ready = []
+        if self._inotify:
+            for path, mask in self._inotify.read(timeout):
+                if path is None:
+                    logger.warning("inotify queue overflowed, rescanning")
+                    for directory in list(self._dirs):
+                        self._scan(directory)
+                elif mask & IN_ISDIR:
+                    # 新建或移入的子目录：添加监视并补齐监视生效前已写入的文件
+                    self._scan(path)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._accept(path):
+                    self._record(path)
+                    self._pending.pop(path, None)
+                    if path not in ready:
+                        ready.append(path)
+        else:
+            time.sleep(timeout)
+            self._rescan_changed_dirs()
+
+        ready.extend(path for path in self._settled() if path not in ready)
+        return ready
+
+    def close(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self) -> 'DirectoryWatcher':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -5,6 +5,9 @@ import re
 class BaseLanguageProcessor(ABC):
     """基础语言处理器抽象类"""
     
+    # protect_special_content 会处理的引号/书名号字符，供预扫描判断能否跳过清洗
+    protected_chars = ''
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.name = config.get('name', 'base')
@@ -6,6 +6,8 @@ from .base import BaseLanguageProcessor
 class EnglishLanguageProcessor(BaseLanguageProcessor):
     """英文语言处理器"""
     
+    protected_chars = '"\''
+    
     def protect_special_content(self, text: str) -> Tuple[str, List[Tuple[str, str, str]]]:
         """保护引号内的内容"""
         quote_pattern = re.compile(r'"([^"]*)"|\'([^\']*)\'')
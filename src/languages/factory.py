@@ -26,8 +26,16 @@ class LanguageProcessorFactory:
         if not processor_class:
             raise ValueError(f"Unsupported language code: {language_code}")
         
+        # 未配置code时使用注册时的语言代码，供处理器缓存和指标按语言区分
+        config = {'code': language_code.lower(), **config}
         return processor_class(config)
     
+    @classmethod
+    def get_protected_chars(cls) -> str:
+        """获取所有已注册处理器需要保护的引号/书名号字符"""
+        chars = ''.join(processor_class.protected_chars for processor_class in cls._processors.values())
+        return ''.join(sorted(set(chars)))
+    
     @classmethod
     def get_supported_languages(cls) -> list:
         """获取支持的语言列表"""
@@ -6,6 +6,8 @@ from .base import BaseLanguageProcessor
 class ChineseLanguageProcessor(BaseLanguageProcessor):
     """中文语言处理器"""
     
+    protected_chars = '《》“”'
+    
     def protect_special_content(self, text: str) -> Tuple[str, List[Tuple[str, str, str]]]:
         """保护书名号和双引号内的内容"""
         bookmark_pattern = re.compile(r'《(.*?)》|“(.*?)”')
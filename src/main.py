@@ -17,7 +17,7 @@ def setup_project_path():
     # 添加项目根目录到Python路径
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
-        print(f"✅ Added to PYTHONPATH: {project_root}")
+        print(f"✅ Added to PYTHONPATH: {project_root}", file=sys.stderr)
     
     return project_root
 
@@ -29,33 +29,37 @@ def main():
     try:
         # 动态导入CLI模块
         from src.cli.cli import main as cli_main
-        print("✅ Successfully imported CLI module")
+        print("✅ Successfully imported CLI module", file=sys.stderr)
         cli_main()
         
     except SystemExit as e:
         # 处理Click的SystemExit异常
         if e.code == 2:
-            print("\n💡 使用说明:")
-            print("   请提供必需的 --input 参数")
-            print("   示例命令:")
-            print("     python src/main.py --input ./data")
-            print("     python src/main.py --input . --language zh")
-            print("     python src/main.py --input ./test_data --workers 5")
+            print("\n💡 使用说明:", file=sys.stderr)
+            print("   请提供必需的 --input 参数", file=sys.stderr)
+            print("   示例命令:", file=sys.stderr)
+            print("     python src/main.py --input ./data", file=sys.stderr)
+            print("     python src/main.py --input . --language zh", file=sys.stderr)
+            print("     python src/main.py --input ./test_data --workers 5", file=sys.stderr)
         elif e.code == 0:
-            print("✅ 程序正常退出")
+            print("✅ 程序正常退出", file=sys.stderr)
         else:
-            print(f"⚠️  程序退出，代码: {e.code}")
+            print(f"⚠️  程序退出，代码: {e.code}", file=sys.stderr)
+        # 保留退出码，供shell和管道（pipefail）判断成败
+        sys.exit(e.code)
             
     except ImportError as e:
-        print(f"❌ 导入错误: {e}")
-        print("请确保在项目根目录运行此脚本")
-        print(f"当前工作目录: {os.getcwd()}")
-        print(f"项目根目录: {project_root}")
+        print(f"❌ 导入错误: {e}", file=sys.stderr)
+        print("请确保在项目根目录运行此脚本", file=sys.stderr)
+        print(f"当前工作目录: {os.getcwd()}", file=sys.stderr)
+        print(f"项目根目录: {project_root}", file=sys.stderr)
+        sys.exit(1)
         
     except Exception as e:
-        print(f"❌ 发生未预期的错误: {e}")
+        print(f"❌ 发生未预期的错误: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
+        sys.exit(1)
 
 # VSCode调试友好的运行方式
 def debug_run(input_path="./test_data", language="auto", workers=10, files=None):
@@ -68,10 +72,10 @@ def debug_run(input_path="./test_data", language="auto", workers=10, files=None)
         workers: 工作线程数，默认为10
         files: 文件索引列表，默认为None
     """
-    print("🔧 调试模式运行...")
-    print(f"   输入路径: {input_path}")
-    print(f"   语言: {language}")
-    print(f"   工作线程: {workers}")
+    print("🔧 调试模式运行...", file=sys.stderr)
+    print(f"   输入路径: {input_path}", file=sys.stderr)
+    print(f"   语言: {language}", file=sys.stderr)
+    print(f"   工作线程: {workers}", file=sys.stderr)
     
     try:
         # 构造命令行参数
@@ -91,7 +95,7 @@ def debug_run(input_path="./test_data", language="auto", workers=10, files=None)
         sys.argv = original_argv
         
     except Exception as e:
-        print(f"❌ 调试运行出错: {e}")
+        print(f"❌ 调试运行出错: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
 
@@ -133,9 +137,9 @@ def create_sample_data():
     with open(en_file, 'w', encoding='utf-8') as f:
         json.dump(en_sample, f, ensure_ascii=False, indent=2)
     
-    print(f"✅ 创建测试数据:")
-    print(f"   {zh_file}")
-    print(f"   {en_file}")
+    print(f"✅ 创建测试数据:", file=sys.stderr)
+    print(f"   {zh_file}", file=sys.stderr)
+    print(f"   {en_file}", file=sys.stderr)
     
     return str(test_dir)
 
@@ -143,11 +147,11 @@ if __name__ == '__main__':
     # 检查是否提供了命令行参数
     if len(sys.argv) == 1:
         # 没有参数时，提供交互式选择
-        print("=== Text Sanitizer ===")
-        print("1. 正常运行 (需要提供参数)")
-        print("2. 调试运行 (使用测试数据)")
-        print("3. 创建测试数据")
-        print("4. 显示帮助")
+        print("=== Text Sanitizer ===", file=sys.stderr)
+        print("1. 正常运行 (需要提供参数)", file=sys.stderr)
+        print("2. 调试运行 (使用测试数据)", file=sys.stderr)
+        print("3. 创建测试数据", file=sys.stderr)
+        print("4. 显示帮助", file=sys.stderr)
         
         choice = input("请选择 (1-4, 默认: 2): ").strip()
         
@@ -155,8 +159,8 @@ if __name__ == '__main__':
             main()
         elif choice == '3':
             test_path = create_sample_data()
-            print(f"\n创建完成！可以使用以下命令测试:")
-            print(f"python src/main.py --input {test_path}")
+            print(f"\n创建完成！可以使用以下命令测试:", file=sys.stderr)
+            print(f"python src/main.py --input {test_path}", file=sys.stderr)
         elif choice == '4':
             # 显示帮助
             try:
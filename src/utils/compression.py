@@ -0,0 +1,94 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+# 文件后缀与压缩格式的对应关系
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+
+# 各压缩格式的文件头魔数
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+}
+
+# --compress 选项可用的取值，same表示沿用输入文件的压缩格式
+COMPRESSION_CHOICES = ['same', 'none'] + list(COMPRESSION_SUFFIXES.values())
+
+# 读写未压缩文件时使用的缓冲区大小
+BUFFER_SIZE = 1 << 20
+
+# gzip默认级别9速度过慢，6在压缩率和速度之间更均衡
+GZIP_LEVEL = 6
+
+
+def get_suffix_compression(path: Union[str, Path]) -> Optional[str]:
+    """根据文件后缀判断压缩格式"""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def get_compression_suffix(compression: Optional[str]) -> str:
+    """获取压缩格式对应的文件后缀"""
+    for suffix, name in COMPRESSION_SUFFIXES.items():
+        if name == compression:
+            return suffix
+    return ''
+
+
+def sniff_compression(path: Union[str, Path]) -> Optional[str]:
+    """读取文件头魔数判断压缩格式"""
+    with open(path, 'rb') as f:
+        header = f.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, name in COMPRESSION_MAGIC.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def detect_compression(path: Union[str, Path]) -> Optional[str]:
+    """判断文件的压缩格式，优先使用后缀，其次使用魔数"""
+    return get_suffix_compression(path) or sniff_compression(path)
+
+
+def open_compressed(path: Union[str, Path], mode: str = 'rb',
+                    compression: Optional[str] = None) -> BinaryIO:
+    """以二进制流方式打开文件，按需透明地解压或压缩"""
+    if mode not in ('rb', 'wb', 'ab'):
+        raise ValueError(f"Unsupported mode: {mode}")
+
+    if compression is None or compression == 'none':
+        return open(path, mode, buffering=BUFFER_SIZE)
+    if compression == 'gzip':
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+    if compression == 'bz2':
+        return bz2.open(path, mode)
+    if compression == 'xz':
+        return lzma.open(path, mode)
+
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def wrap_compressed(fileobj: BinaryIO, compression: Optional[str],
+                    name: str = '') -> Optional[BinaryIO]:
+    """
+    在已打开的二进制文件上创建压缩写入流，无需压缩时返回None
+
+    关闭返回的压缩流只会结束当前压缩段，不会关闭底层文件，
+    因此可以在同一文件上连续写出多个压缩段（gzip/bz2/xz均支持多段拼接读取）。
+    """
+    if compression is None or compression == 'none':
+        return None
+    if compression == 'gzip':
+        return gzip.GzipFile(filename=name, mode='wb', compresslevel=GZIP_LEVEL, fileobj=fileobj)
+    if compression == 'bz2':
+        return bz2.BZ2File(fileobj, 'wb')
+    if compression == 'xz':
+        return lzma.LZMAFile(fileobj, 'wb')
+
+    raise ValueError(f"Unsupported compression: {compression}")
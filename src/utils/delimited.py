@@ -0,0 +1,103 @@
+import csv
+import io
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+# 各分隔格式使用的分隔符
+DELIMITERS = {
+    'csv': ',',
+    'tsv': '\t',
+}
+
+# 每批解析的行数
+BATCH_ROWS = 2000
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class _LineReader:
+    """逐行读取二进制流并解码，同时统计已消费的字节数，供csv.reader使用"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.consumed = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.stream.readline()
+        if not line:
+            raise StopIteration
+        if self.consumed == 0 and line.startswith(_UTF8_BOM):
+            self.consumed += len(_UTF8_BOM)
+            line = line[len(_UTF8_BOM):]
+        self.consumed += len(line)
+        return line.decode('utf-8')
+
+
+def read_first_row(stream: BinaryIO, delimiter: str) -> Tuple[Optional[List[str]], str]:
+    """读取首行记录，并根据其换行符推断输出使用的换行符"""
+    lines = _LineReader(stream)
+    raw_lines = []
+
+    def remember():
+        for line in lines:
+            raw_lines.append(line)
+            yield line
+
+    row = next(csv.reader(remember(), delimiter=delimiter), None)
+    line_terminator = '\r\n' if raw_lines and raw_lines[-1].endswith('\r\n') else '\n'
+    return row, line_terminator
+
+
+def iter_row_batches(stream: BinaryIO, delimiter: str,
+                     batch_rows: int = BATCH_ROWS) -> Iterator[Tuple[List[List[str]], int]]:
+    """
+    按批解析分隔文本，产出 (记录列表, 本批消费的字节数)
+
+    csv.reader只在一条记录读完后才返回，不会预读，
+    因此每批结束时的字节数恰好落在记录边界上，可用作检查点偏移。
+    """
+    lines = _LineReader(stream)
+    reader = csv.reader(lines, delimiter=delimiter)
+    batch = []
+    start = 0
+    for row in reader:
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            yield batch, lines.consumed - start
+            start = lines.consumed
+            batch = []
+    if batch:
+        yield batch, lines.consumed - start
+
+
+def format_rows(rows: List[List[str]], delimiter: str, line_terminator: str = '\n') -> bytes:
+    """将记录列表格式化为分隔文本"""
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=delimiter, lineterminator=line_terminator).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def resolve_columns(columns: Optional[Sequence[str]], header: Optional[List[str]]) -> Optional[List[int]]:
+    """
+    将列选择解析为从0开始的列下标，None表示全部列
+
+    列可以用表头中的列名或从1开始的序号指定。
+    """
+    if not columns:
+        return None
+
+    indices = []
+    for column in columns:
+        if column.isdigit():
+            if int(column) < 1:
+                raise ValueError(f"Column index must start from 1: {column}")
+            indices.append(int(column) - 1)
+        elif header is None:
+            raise ValueError(f"Column name requires a header row: {column}")
+        elif column in header:
+            indices.append(header.index(column))
+        else:
+            raise ValueError(f"Column not found in header: {column}")
+    return sorted(set(indices))
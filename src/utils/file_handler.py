@@ -1,53 +1,235 @@
-import json
+import hashlib
 import logging
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .compression import (
+    BUFFER_SIZE, detect_compression, get_compression_suffix, get_suffix_compression,
+    open_compressed, wrap_compressed,
+)
+from .json_codec import JsonCodec, get_codec
 
 logger = logging.getLogger(__name__)
 
-def load_json_file(file_path: Union[str, Path]) -> Dict[str, Any]:
-    """加载JSON文件"""
+# 支持的数据格式及其文件后缀（可再叠加压缩后缀，如 .jsonl.gz）
+FORMAT_SUFFIXES = {
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'csv': '.csv',
+    'tsv': '.tsv',
+    'txt': '.txt',
+}
+DATA_SUFFIXES = tuple(FORMAT_SUFFIXES.values())
+
+# 扫描目录时默认处理的格式，其他格式需显式启用
+DEFAULT_FORMATS = ('json', 'jsonl')
+
+# 已处理文件的文件名后缀标记
+PROCESSED_MARK = '_p'
+
+_default_codec = None
+
+def _resolve_codec(codec: JsonCodec = None) -> JsonCodec:
+    """未指定编解码器时使用自动选择的默认实现"""
+    global _default_codec
+    if codec is not None:
+        return codec
+    if _default_codec is None:
+        _default_codec = get_codec('auto')
+    return _default_codec
+
+def split_data_suffix(file_path: Union[str, Path]) -> Tuple[str, str, Optional[str]]:
+    """拆分文件名为 (主干, 数据后缀, 后缀表示的压缩格式)，如 a.jsonl.gz -> ('a', '.jsonl', 'gzip')"""
+    name = Path(file_path).name
+    compression = get_suffix_compression(name)
+    if compression:
+        name = name[:-len(get_compression_suffix(compression))]
+
+    data_suffix = Path(name).suffix
+    if data_suffix.lower() not in DATA_SUFFIXES:
+        return name, '', compression
+    return name[:-len(data_suffix)], data_suffix.lower(), compression
+
+def get_file_format(file_path: Union[str, Path]) -> Optional[str]:
+    """根据后缀判断数据格式，如 a.csv.gz -> 'csv'，不支持时返回None"""
+    data_suffix = split_data_suffix(file_path)[1]
+    for name, suffix in FORMAT_SUFFIXES.items():
+        if suffix == data_suffix:
+            return name
+    return None
+
+def is_supported_file(file_path: Union[str, Path], formats: Tuple[str, ...] = None) -> bool:
+    """判断是否为支持的数据文件（含压缩文件），formats为None时接受所有格式"""
+    file_format = get_file_format(file_path)
+    return file_format is not None and (formats is None or file_format in formats)
+
+def is_processed_file(file_path: Union[str, Path]) -> bool:
+    """判断是否为已处理的输出文件"""
+    return split_data_suffix(file_path)[0].endswith(PROCESSED_MARK)
+
+def get_output_path(input_path: Union[str, Path], compression: str = 'same') -> Path:
+    """生成输出文件路径，compression为same时沿用输入文件的压缩格式"""
+    input_path = Path(input_path)
+    stem, data_suffix, _ = split_data_suffix(input_path)
+    if compression == 'same':
+        compression = detect_compression(input_path)
+
+    suffix = get_compression_suffix(compression)
+    return input_path.with_name(f"{stem}{PROCESSED_MARK}{data_suffix}{suffix}")
+
+def find_output_conflicts(files: List[Path], compression: str = 'same') -> Dict[Path, List[Path]]:
+    """
+    找出映射到同一输出文件的输入，如 --compress none 时 a.json 与 a.json.gz 都输出到 a_p.json
+
+    返回 {输出路径: [输入文件, ...]}，只包含有冲突的输出。
+    """
+    outputs: Dict[Path, List[Path]] = {}
+    for file_path in files:
+        outputs.setdefault(get_output_path(file_path, compression), []).append(file_path)
+    return {output: inputs for output, inputs in outputs.items() if len(inputs) > 1}
+
+def get_partial_path(file_path: Union[str, Path]) -> Path:
+    """获取写入过程中使用的临时文件路径"""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.name}.part")
+
+class AtomicFileWriter:
+    """
+    原子写文件：先写入同目录下的 .part 临时文件，完成后重命名为目标文件
+
+    进程在写入途中崩溃只会留下 .part 文件，目标文件要么不存在要么是完整的。
+    sync() 会结束当前压缩段并落盘，返回的偏移量之前的内容可以安全续写；
+    传入 resume_offset 时截断 .part 文件到该位置并从此处继续写入。
+    """
+    
+    def __init__(self, file_path: Union[str, Path], compression: Optional[str] = None,
+                 resume_offset: Optional[int] = None):
+        self.path = Path(file_path)
+        self.partial_path = get_partial_path(self.path)
+        self.compression = compression
+        
+        if resume_offset is None:
+            self._raw = open(self.partial_path, 'wb', buffering=BUFFER_SIZE)
+        else:
+            self._raw = open(self.partial_path, 'r+b', buffering=BUFFER_SIZE)
+            self._raw.truncate(resume_offset)
+            self._raw.seek(resume_offset)
+        self._segment = None
+    
+    def write(self, data: bytes) -> None:
+        if self._segment is None:
+            self._segment = wrap_compressed(self._raw, self.compression, self.path.name) or self._raw
+        self._segment.write(data)
+    
+    def sync(self) -> int:
+        """结束当前压缩段并落盘，返回可安全续写的文件偏移"""
+        if self._segment is not None and self._segment is not self._raw:
+            self._segment.close()
+            self._segment = None
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        return self._raw.tell()
+    
+    def commit(self) -> None:
+        """完成写入并原子替换目标文件"""
+        self.sync()
+        self._raw.close()
+        os.replace(self.partial_path, self.path)
+    
+    def close(self) -> None:
+        """放弃写入，保留 .part 文件供续写"""
+        if self._segment is not None and self._segment is not self._raw:
+            self._segment.close()
+        self._segment = None
+        self._raw.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.close()
+
+def load_json_file(file_path: Union[str, Path], codec: JsonCodec = None) -> Dict[str, Any]:
+    """加载JSON文件，压缩文件会被透明解压"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open_compressed(file_path, 'rb', detect_compression(file_path)) as f:
+            return _resolve_codec(codec).loads(f.read())
     except Exception as e:
         logger.error(f"Failed to load JSON file {file_path}: {str(e)}")
         raise
 
-def save_json_file(data: Dict[str, Any], file_path: Union[str, Path]) -> None:
-    """保存JSON文件"""
+def save_json_file(data: Dict[str, Any], file_path: Union[str, Path],
+                   output_format: str = 'pretty', codec: JsonCodec = None) -> None:
+    """保存JSON文件，按输出文件后缀决定是否压缩，写入完成后原子替换"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        payload = _resolve_codec(codec).dumps(data, output_format)
+        with AtomicFileWriter(file_path, get_suffix_compression(file_path)) as f:
+            f.write(payload)
         logger.info(f"Successfully saved file: {file_path}")
     except Exception as e:
         logger.error(f"Failed to save JSON file {file_path}: {str(e)}")
         raise
 
-def find_json_files(path: Union[str, Path]) -> List[Path]:
-    """查找指定路径下的所有JSON文件"""
+def find_json_files(path: Union[str, Path], formats: Tuple[str, ...] = None) -> List[Path]:
+    """
+    查找指定路径下的数据文件（含压缩文件）
+    
+    扫描目录时只返回formats中的格式（默认JSON/JSONL）；直接指定的文件只要格式受支持即返回。
+    """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Path does not exist: {path}")
     
     if path.is_file():
-        return [path] if path.suffix.lower() == '.json' else []
+        return [path] if is_supported_file(path) else []
     
-    return list(path.glob('**/*.json'))
+    formats = formats or DEFAULT_FORMATS
+    return [f for f in path.glob('**/*') if is_supported_file(f, formats) and f.is_file()]
+
+def get_relative_key(file_path: Union[str, Path], root: Union[str, Path]) -> str:
+    """获取文件相对输入根目录的POSIX路径，作为跨节点一致的文件标识"""
+    file_path, root = Path(file_path), Path(root)
+    if root.is_file():
+        return file_path.name
+    return file_path.relative_to(root).as_posix()
 
-def select_files(path: Union[str, Path], selected_indices: List[int] = None) -> List[Path]:
-    """选择要处理的文件"""
-    files = find_json_files(path)
+def get_shard(key: str, shard_count: int) -> int:
+    """根据路径哈希计算文件所属分片（1-based），与节点和挂载点无关"""
+    digest = hashlib.md5(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count + 1
+
+def list_input_files(path: Union[str, Path], formats: Tuple[str, ...] = None) -> List[Path]:
+    """查找待处理的输入文件，排除已处理的输出文件"""
+    files = find_json_files(path, formats)
     
     if not files:
-        logger.warning("No JSON files found")
+        logger.warning("No input files found")
         return []
     
+    return [f for f in files if not is_processed_file(f)]
+
+def select_files(path: Union[str, Path], selected_indices: List[int] = None,
+                 shard: Tuple[int, int] = None, formats: Tuple[str, ...] = None,
+                 files: List[Path] = None) -> List[Path]:
+    """
+    选择要处理的文件，shard为 (K, N) 时只保留第K个分片的文件
+    
+    files 为 list_input_files 已得到的输入文件列表，省略时重新查找。
+    """
+    valid_files = list_input_files(path, formats) if files is None else files
+    
+    if shard is not None:
+        shard_index, shard_count = shard
+        valid_files = [f for f in valid_files
+                       if get_shard(get_relative_key(f, path), shard_count) == shard_index]
+    
     if selected_indices is None:
-        return [f for f in files if not f.name.endswith('_p.json')]
+        return valid_files
     
-    # 过滤已处理的文件并根据索引选择
-    valid_files = [f for f in files if not f.name.endswith('_p.json')]
+    # 根据索引选择
     selected_files = [valid_files[i-1] for i in selected_indices if 1 <= i <= len(valid_files)]
     
     return selected_files
\ No newline at end of file
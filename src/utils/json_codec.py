@@ -0,0 +1,110 @@
+import json
+import logging
+import math
+from typing import Any, Dict, Type
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时回退到标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 支持的输出格式
+OUTPUT_FORMATS = ('pretty', 'compact')
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class JsonCodec:
+    """JSON编解码器基类，统一以bytes作为输入输出"""
+
+    name = 'base'
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def dumps(self, obj: Any, output_format: str = 'pretty') -> bytes:
+        raise NotImplementedError
+
+
+class StdlibJsonCodec(JsonCodec):
+    """基于标准库json的编解码器"""
+
+    name = 'stdlib'
+
+    def loads(self, data: bytes) -> Any:
+        # json.loads可直接处理bytes，并自动识别UTF-8/16/32及BOM
+        return json.loads(data)
+
+    def dumps(self, obj: Any, output_format: str = 'pretty') -> bytes:
+        if output_format == 'compact':
+            text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+        else:
+            text = json.dumps(obj, ensure_ascii=False, indent=2)
+        return text.encode('utf-8')
+
+
+class OrjsonCodec(StdlibJsonCodec):
+    """基于orjson的编解码器，输出与StdlibJsonCodec逐字节一致"""
+
+    name = 'orjson'
+
+    def loads(self, data: bytes) -> Any:
+        if data.startswith(_UTF8_BOM):
+            data = data[len(_UTF8_BOM):]
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN、超大整数或非UTF-8编码等orjson不支持的输入交给标准库
+            return super().loads(data)
+
+    def dumps(self, obj: Any, output_format: str = 'pretty') -> bytes:
+        # orjson将NaN/Infinity写作null，且科学计数法格式与标准库不同（1e16、0.00005），
+        # 数据中存在这类浮点数时回退到标准库以保证输出一致且不丢失数据
+        if _has_special_float(obj):
+            return super().dumps(obj, output_format)
+
+        option = orjson.OPT_INDENT_2 if output_format == 'pretty' else 0
+        try:
+            return orjson.dumps(obj, option=option)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj, output_format)
+
+
+def _has_special_float(obj: Any) -> bool:
+    """判断数据中是否包含非有限浮点数或标准库以科学计数法表示的浮点数"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, float) and (not math.isfinite(item) or 'e' in repr(item)):
+            return True
+    return False
+
+
+_CODECS: Dict[str, Type[JsonCodec]] = {
+    'stdlib': StdlibJsonCodec,
+}
+if orjson is not None:
+    _CODECS['orjson'] = OrjsonCodec
+
+
+def get_available_codecs() -> list:
+    """获取当前环境可用的编解码器列表"""
+    return list(_CODECS.keys())
+
+
+def get_codec(name: str = 'auto') -> JsonCodec:
+    """获取编解码器实例，auto时优先选择已安装的最快实现"""
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in _CODECS else 'stdlib'
+
+    codec_class = _CODECS.get(name)
+    if not codec_class:
+        raise ValueError(f"Unsupported JSON codec: {name}")
+
+    return codec_class()
@@ -0,0 +1,88 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.core.autotune import InFlightController, TuningPlan, WarmupStats, plan_tuning
+from src.core.processor import BatchProcessor
+from src.utils.metrics import metrics
+
+def make_warmup(files: int, size: int, wall: float, cpu: float) -> WarmupStats:
+    warmup = WarmupStats()
+    for _ in range(files):
+        warmup.add(size, wall, cpu)
+    return warmup
+
+class TestAutotune(unittest.TestCase):
+
+    def test_plan_cpu_bound_uses_processes(self):
+        """测试CPU密集且工作量大时选择进程池并合并小文件"""
+        warmup = make_warmup(4, 1000, 0.01, 0.01)
+        plan = plan_tuning([1000] * 100, 2000, warmup, cpu_count=8)
+        self.assertEqual(plan.executor, 'process')
+        self.assertEqual(plan.workers, 8)
+        self.assertEqual(plan.chunk_size, 25)
+        self.assertEqual(plan.in_flight, 8)
+
+    def test_plan_io_bound_uses_threads(self):
+        """测试I/O等待为主时使用更多线程，工作量小时不启动进程池"""
+        io_bound = plan_tuning([1000] * 10, 100, make_warmup(4, 1000, 0.1, 0.025), cpu_count=8)
+        self.assertEqual((io_bound.executor, io_bound.workers), ('thread', 4))
+
+        small = plan_tuning([1000] * 10, 10, make_warmup(4, 1000, 0.01, 0.01), cpu_count=8)
+        self.assertEqual((small.executor, small.workers), ('thread', 1))
+
+        self.assertEqual(plan_tuning([], 1, WarmupStats()).workers, 1)
+
+    def test_controller_hill_climbs(self):
+        """测试在途任务上限随吞吐量变化调整"""
+        controller = InFlightController(4, maximum=8, interval=1.0)
+        start = controller._window_start
+        controller.record(100, now=start + 1)
+        self.assertEqual(controller.limit, 5)
+        controller.record(200, now=start + 2)
+        self.assertEqual(controller.limit, 6)
+        # 吞吐量下降后反向调整
+        controller.record(50, now=start + 3)
+        self.assertEqual(controller.limit, 5)
+        controller.record(50, now=start + 3.5)
+        self.assertEqual(controller.limit, 5)
+
+    def test_process_files_auto(self):
+        """测试自动模式在线程池和进程池下处理全部文件"""
+        for plan in (TuningPlan('thread', 2), TuningPlan('process', 2, chunk_size=3)):
+            with self.subTest(executor=plan.executor), tempfile.TemporaryDirectory() as tmp_dir:
+                root = Path(tmp_dir)
+                for i in range(12):
+                    (root / f'{i:02d}.json').write_text(json.dumps({'text': f'有{i}辆车'}),
+                                                       encoding='utf-8')
+
+                processor = BatchProcessor(language_code='zh', max_workers='auto')
+                with mock.patch('src.core.processor.plan_tuning', return_value=plan):
+                    self.assertEqual(processor.process_files(str(root)), 12)
+                for i in range(12):
+                    output = json.loads((root / f'{i:02d}_p.json').read_text(encoding='utf-8'))
+                    self.assertEqual(output, {'text': '有X辆车'})
+
+    def test_process_plan_metrics(self):
+        """测试进程池中记录的指标汇总到主进程"""
+        files = metrics.counter('batch_processor_files_total', '', ('status',)).labels('success')
+        records = metrics.counter('batch_processor_records_total', '').labels()
+        latency = metrics.histogram('batch_processor_file_seconds', '').labels()
+        strings = metrics.histogram('text_sanitizer_latency_seconds', '', ('language',)).labels('zh')
+        before = (files.value, records.value, sum(latency.counts), sum(strings.counts))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            for i in range(8):
+                (root / f'{i}.json').write_text(json.dumps({'text': f'有{i}辆车'}), encoding='utf-8')
+            processor = BatchProcessor(language_code='zh', max_workers='auto')
+            with mock.patch('src.core.processor.plan_tuning',
+                            return_value=TuningPlan('process', 2, chunk_size=2)):
+                self.assertEqual(processor.process_files(str(root)), 8)
+
+        after = (files.value, records.value, sum(latency.counts), sum(strings.counts))
+        self.assertEqual([a - b for a, b in zip(after, before)], [8, 8, 8, 8])
+
+if __name__ == '__main__':
+    unittest.main()
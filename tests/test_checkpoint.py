@@ -0,0 +1,143 @@
+import functools
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.core.checkpoint import Checkpoint, get_checkpoint_path
+from src.core.processor import BatchProcessor
+from src.core.streaming import iter_line_batches
+from src.utils.file_handler import get_partial_path
+
+class CrashingProcessor(BatchProcessor):
+    """处理若干批后模拟崩溃的处理器"""
+
+    def __init__(self, crash_after: int, **kwargs):
+        super().__init__(**kwargs)
+        self.crash_after = crash_after
+        self.batches = 0
+
+    def _sanitize_jsonl_lines(self, lines):
+        self.batches += 1
+        if self.batches > self.crash_after:
+            raise RuntimeError("simulated crash")
+        return super()._sanitize_jsonl_lines(lines)
+
+class CountingProcessor(BatchProcessor):
+    """统计实际处理记录数的处理器"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lines = 0
+
+    def _sanitize_jsonl_lines(self, lines):
+        self.lines += len(lines)
+        return super()._sanitize_jsonl_lines(lines)
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.source = self.root / 'records.jsonl.gz'
+        self.output = self.root / 'records_p.jsonl.gz'
+        self.records = [{"id": i, "text": f"第{i}条记录，共有{i}个测试案例"} for i in range(200)]
+        with gzip.open(self.source, 'wt', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        # 使用很小的批次，让一个小文件也能产生多个检查点
+        small_batches = functools.partial(iter_line_batches, batch_bytes=500)
+        patcher = mock.patch('src.core.processor.iter_line_batches', small_batches)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_output(self):
+        with gzip.open(self.output, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_crash_leaves_no_output(self):
+        """测试崩溃后不会留下不完整的输出文件"""
+        processor = CrashingProcessor(crash_after=5, language_code='zh', checkpoint_interval=0)
+        self.assertFalse(processor.process_single_file(self.source, self.output))
+        self.assertFalse(self.output.exists())
+        self.assertTrue(get_partial_path(self.output).exists())
+
+        checkpoint = Checkpoint.load(get_checkpoint_path(self.output))
+        self.assertIsNotNone(checkpoint)
+        self.assertGreater(checkpoint.records, 0)
+        self.assertLess(checkpoint.records, len(self.records))
+
+    def test_resume_from_checkpoint(self):
+        """测试从检查点续跑且不重复处理已完成的记录"""
+        crashing = CrashingProcessor(crash_after=5, language_code='zh', checkpoint_interval=0)
+        crashing.process_single_file(self.source, self.output)
+        finished = Checkpoint.load(get_checkpoint_path(self.output)).records
+
+        resumed = CountingProcessor(language_code='zh', resume=True, checkpoint_interval=0)
+        self.assertTrue(resumed.process_single_file(self.source, self.output))
+        self.assertEqual(resumed.lines, len(self.records) - finished)
+
+        fresh = BatchProcessor(language_code='zh')
+        expected = [fresh.sanitizer.sanitize_json_data(r) for r in self.records]
+        self.assertEqual(self._read_output(), expected)
+        self.assertFalse(get_checkpoint_path(self.output).exists())
+        self.assertFalse(get_partial_path(self.output).exists())
+
+    def test_resume_skips_finished_files(self):
+        """测试续跑时跳过已完成的文件"""
+        BatchProcessor(language_code='zh').process_single_file(self.source, self.output)
+        resumed = CountingProcessor(language_code='zh', resume=True)
+        self.assertTrue(resumed.process_single_file(self.source, self.output))
+        self.assertEqual(resumed.lines, 0)
+
+    def test_fresh_run_discards_stale_checkpoint(self):
+        """测试崩溃 -> 不续跑重新运行 -> 再次崩溃后续跑，不会使用旧检查点截断新的临时文件"""
+        CrashingProcessor(crash_after=8, language_code='zh', checkpoint_interval=0) \
+            .process_single_file(self.source, self.output)
+        self.assertTrue(get_checkpoint_path(self.output).exists())
+
+        # 第二次运行不续跑且未到检查点间隔就崩溃
+        CrashingProcessor(crash_after=3, language_code='zh', checkpoint_interval=1000) \
+            .process_single_file(self.source, self.output)
+        self.assertFalse(get_checkpoint_path(self.output).exists())
+
+        resumed = CountingProcessor(language_code='zh', resume=True, checkpoint_interval=0)
+        self.assertTrue(resumed.process_single_file(self.source, self.output))
+        self.assertEqual(resumed.lines, len(self.records))
+        fresh = BatchProcessor(language_code='zh')
+        self.assertEqual(self._read_output(),
+                         [fresh.sanitizer.sanitize_json_data(r) for r in self.records])
+
+    def test_mismatched_partial_restarts(self):
+        """测试临时文件与检查点记录的内容不一致时从头处理"""
+        CrashingProcessor(crash_after=8, language_code='zh', checkpoint_interval=0) \
+            .process_single_file(self.source, self.output)
+        partial_path = get_partial_path(self.output)
+        checkpoint = Checkpoint.load(get_checkpoint_path(self.output))
+        data = bytearray(partial_path.read_bytes())
+        data[checkpoint.output_offset - 1] ^= 0xFF
+        partial_path.write_bytes(bytes(data))
+
+        resumed = CountingProcessor(language_code='zh', resume=True)
+        self.assertTrue(resumed.process_single_file(self.source, self.output))
+        self.assertEqual(resumed.lines, len(self.records))
+        self.assertEqual(len(self._read_output()), len(self.records))
+
+    def test_changed_input_restarts(self):
+        """测试输入文件变化后从头处理"""
+        crashing = CrashingProcessor(crash_after=5, language_code='zh', checkpoint_interval=0)
+        crashing.process_single_file(self.source, self.output)
+        with gzip.open(self.source, 'at', encoding='utf-8') as f:
+            f.write(json.dumps({"id": 200, "text": "新增1条"}, ensure_ascii=False) + '\n')
+
+        resumed = CountingProcessor(language_code='zh', resume=True)
+        self.assertTrue(resumed.process_single_file(self.source, self.output))
+        self.assertEqual(resumed.lines, len(self.records) + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import gzip
+import json
+import lzma
+import tempfile
+import unittest
+from pathlib import Path
+from src.core.processor import BatchProcessor
+from src.core.streaming import run_pipeline
+from src.utils.compression import detect_compression, open_compressed
+from src.utils.file_handler import find_json_files, get_output_path, get_shard, select_files
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_detect_compression(self):
+        """测试按后缀和魔数识别压缩格式"""
+        disguised = self.root / 'disguised.json'
+        disguised.write_bytes(gzip.compress(b'{}'))
+        plain = self.root / 'plain.json'
+        plain.write_bytes(b'{}')
+
+        self.assertEqual(detect_compression(self.root / 'a.json.xz'), 'xz')
+        self.assertEqual(detect_compression(disguised), 'gzip')
+        self.assertIsNone(detect_compression(plain))
+
+    def test_output_path(self):
+        """测试输出文件命名"""
+        path = self.root / 'data.jsonl.gz'
+        self.assertEqual(get_output_path(path).name, 'data_p.jsonl.gz')
+        self.assertEqual(get_output_path(path, 'none').name, 'data_p.jsonl')
+        self.assertEqual(get_output_path(path, 'bz2').name, 'data_p.jsonl.bz2')
+
+    def test_find_compressed_files(self):
+        """测试查找压缩文件并跳过已处理文件"""
+        for name in ('a.json', 'b.jsonl.gz', 'c.json.bz2', 'd.txt.gz', 'a_p.json.xz'):
+            (self.root / name).write_bytes(b'')
+
+        found = sorted(f.name for f in find_json_files(self.root))
+        self.assertEqual(found, ['a.json', 'a_p.json.xz', 'b.jsonl.gz', 'c.json.bz2'])
+        selected = sorted(f.name for f in select_files(self.root))
+        self.assertEqual(selected, ['a.json', 'b.jsonl.gz', 'c.json.bz2'])
+
+    def test_process_compressed_jsonl(self):
+        """测试流式处理压缩JSONL文件并转换压缩格式"""
+        records = [{"text": f"有{i}辆车", "id": i} for i in range(1000)]
+        source = self.root / 'records.jsonl.gz'
+        with gzip.open(source, 'wt', encoding='utf-8') as f:
+            f.write('\n'.join(json.dumps(r, ensure_ascii=False) for r in records))
+
+        processor = BatchProcessor(language_code='zh', compression='xz')
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+
+        with lzma.open(self.root / 'records_p.jsonl.xz', 'rt', encoding='utf-8') as f:
+            output = [json.loads(line) for line in f]
+        self.assertEqual(len(output), len(records))
+        self.assertEqual(output[5], {"text": "有X辆车", "id": 5})
+
+    def test_process_compressed_json(self):
+        """测试处理压缩JSON文档"""
+        source = self.root / 'doc.json.bz2'
+        with open_compressed(source, 'wb', 'bz2') as f:
+            f.write('{"content": "今天是2025年8月7日"}'.encode('utf-8'))
+
+        processor = BatchProcessor(language_code='zh')
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+        with open_compressed(self.root / 'doc_p.json.bz2', 'rb', 'bz2') as f:
+            self.assertEqual(json.loads(f.read()), {"content": "今天是X年X月X日"})
+
+    def test_output_conflicts_skipped(self):
+        """测试多个输入映射到同一输出文件时跳过并报错，而不是相互覆盖"""
+        (self.root / 'a.json').write_text('{"text": "有1辆车"}', encoding='utf-8')
+        with open_compressed(self.root / 'a.json.gz', 'wb', 'gzip') as f:
+            f.write('{"text": "有2辆车"}'.encode('utf-8'))
+        (self.root / 'b.json').write_text('{"text": "有3辆车"}', encoding='utf-8')
+
+        processor = BatchProcessor(language_code='zh', compression='none')
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+        self.assertFalse((self.root / 'a_p.json').exists())
+        self.assertTrue((self.root / 'b_p.json').exists())
+
+        # 输出保持各自的压缩格式时互不冲突
+        processor = BatchProcessor(language_code='zh')
+        self.assertEqual(processor.process_files(str(self.root)), 3)
+
+    def test_output_conflicts_across_shards(self):
+        """测试冲突的输入落在不同分片时，各分片都会跳过"""
+        (self.root / 'b0.json').write_text('{"text": "有1辆车"}', encoding='utf-8')
+        with open_compressed(self.root / 'b0.json.gz', 'wb', 'gzip') as f:
+            f.write('{"text": "有2辆车"}'.encode('utf-8'))
+        self.assertNotEqual(get_shard('b0.json', 2), get_shard('b0.json.gz', 2))
+
+        processor = BatchProcessor(language_code='zh', compression='none')
+        for k in (1, 2):
+            self.assertEqual(processor.process_files(str(self.root), shard=(k, 2)), 0)
+        self.assertFalse((self.root / 'b0_p.json').exists())
+
+    def test_pipeline_propagates_errors(self):
+        """测试流水线中的异常被重新抛出"""
+        def transform(batch):
+            if batch == 3:
+                raise RuntimeError("boom")
+            return batch
+
+        written = []
+        with self.assertRaises(RuntimeError):
+            run_pipeline(iter(range(100)), transform, written.append, depth=2)
+        self.assertNotIn(3, written)
+
+if __name__ == '__main__':
+    unittest.main()
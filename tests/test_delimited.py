@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from src.core.processor import BatchProcessor
+from src.utils.delimited import iter_row_batches, resolve_columns
+from src.utils.file_handler import find_json_files
+
+class TestDelimited(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resolve_columns(self):
+        """测试按列名和序号选择列"""
+        header = ['id', 'name', 'note']
+        self.assertIsNone(resolve_columns(None, header))
+        self.assertEqual(resolve_columns(['note', '1'], header), [0, 2])
+        with self.assertRaises(ValueError):
+            resolve_columns(['missing'], header)
+        with self.assertRaises(ValueError):
+            resolve_columns(['note'], None)
+
+    def test_batch_offsets_on_record_boundaries(self):
+        """测试批次偏移落在记录边界上，包括跨行的引号字段"""
+        payload = 'a,b\r\n1,"line one\nline two"\r\n2,x\r\n3,y\r\n'.encode('utf-8')
+        batches = list(iter_row_batches(io.BytesIO(payload), ',', batch_rows=2))
+        self.assertEqual([rows for rows, _ in batches],
+                         [[['a', 'b'], ['1', 'line one\nline two']], [['2', 'x'], ['3', 'y']]])
+        self.assertEqual(sum(consumed for _, consumed in batches), len(payload))
+        self.assertEqual(payload[batches[0][1]:], b'2,x\r\n3,y\r\n')
+
+    def test_scan_formats(self):
+        """测试目录扫描默认只处理JSON格式"""
+        for name in ('a.json', 'b.csv', 'c.tsv.gz', 'd.txt'):
+            (self.root / name).write_bytes(b'')
+        self.assertEqual(sorted(f.name for f in find_json_files(self.root)), ['a.json'])
+        self.assertEqual(sorted(f.name for f in find_json_files(self.root, ('csv', 'tsv'))),
+                         ['b.csv', 'c.tsv.gz'])
+        self.assertEqual(find_json_files(self.root / 'd.txt'), [self.root / 'd.txt'])
+
+    def test_process_csv_with_columns(self):
+        """测试CSV只清洗选中的列且保留表头"""
+        source = self.root / 'export.csv'
+        source.write_text('id,content,note\r\n1,有123辆车,共有5个\r\n2,"今天是2025年8月7日, 晴",7个\r\n',
+                          encoding='utf-8')
+
+        processor = BatchProcessor(language_code='zh', formats=('csv',), columns=['content'])
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+
+        output = (self.root / 'export_p.csv').read_bytes().decode('utf-8')
+        self.assertEqual(list(csv.reader(io.StringIO(output))), [
+            ['id', 'content', 'note'],
+            ['1', '有X辆车', '共有5个'],
+            ['2', '今天是X年X月X日, 晴', '7个'],
+        ])
+        self.assertTrue(output.endswith('\r\n'))
+
+    def test_process_tsv_without_header(self):
+        """测试无表头的压缩TSV文件"""
+        source = self.root / 'export.tsv.gz'
+        with gzip.open(source, 'wt', encoding='utf-8') as f:
+            f.write('1\t有123辆车\n2\t共有5个\n')
+
+        processor = BatchProcessor(language_code='zh', formats=('tsv',), columns=['2'],
+                                   has_header=False)
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+        with gzip.open(self.root / 'export_p.tsv.gz', 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '1\t有X辆车\n2\t共有X个\n')
+
+    def test_process_text(self):
+        """测试纯文本逐行清洗并保留换行符"""
+        source = self.root / 'app.txt'
+        source.write_bytes('今天是2025年8月7日\r\n\n有123辆车'.encode('utf-8'))
+
+        processor = BatchProcessor(language_code='zh', formats=('txt',))
+        self.assertEqual(processor.process_files(str(self.root)), 1)
+        self.assertEqual((self.root / 'app_p.txt').read_bytes(),
+                         '今天是X年X月X日\r\n\n有X辆车'.encode('utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
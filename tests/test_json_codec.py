@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.utils.json_codec import get_available_codecs, get_codec
+from src.utils.file_handler import load_json_file, save_json_file
+
+SAMPLE_DATA = {
+    "title": "《星际公元5102年消费者权益保护测试》",
+    "content": "Today is 5102-08-17 \"quoted\" \\ \u001f",
+    "numbers": [1, -0.0, 0.1, 1e16, 1e-7, 5e-05, 2 ** 63, None, True],
+    "special": [float('nan'), float('inf'), float('-inf')],
+    "nested": {"empty_list": [], "empty_dict": {}, "items": [{"x": "y"}]},
+}
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_stdlib_always_available(self):
+        """测试标准库编解码器始终可用"""
+        self.assertIn('stdlib', get_available_codecs())
+        self.assertIn(get_codec('auto').name, get_available_codecs())
+
+    def test_unsupported_codec(self):
+        """测试不支持的编解码器"""
+        with self.assertRaises(ValueError):
+            get_codec('xx')
+
+    def test_byte_stable_across_codecs(self):
+        """测试不同编解码器输出逐字节一致"""
+        reference = get_codec('stdlib')
+        for name in get_available_codecs():
+            codec = get_codec(name)
+            for output_format in ('pretty', 'compact'):
+                with self.subTest(codec=name, output_format=output_format):
+                    self.assertEqual(codec.dumps(SAMPLE_DATA, output_format),
+                                     reference.dumps(SAMPLE_DATA, output_format))
+
+    def test_loads_bytes(self):
+        """测试直接解码bytes，包括BOM"""
+        # NaN与自身不相等，通过重新编码比较解码结果
+        reference = get_codec('stdlib')
+        payload = reference.dumps(SAMPLE_DATA, 'compact')
+        for name in get_available_codecs():
+            with self.subTest(codec=name):
+                codec = get_codec(name)
+                self.assertEqual(reference.dumps(codec.loads(payload), 'compact'), payload)
+                self.assertEqual(reference.dumps(codec.loads(b'\xef\xbb\xbf' + payload), 'compact'),
+                                 payload)
+
+    def test_file_round_trip(self):
+        """测试文件读写往返"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'data.json'
+            save_json_file(SAMPLE_DATA, path, 'compact')
+            self.assertNotIn(b'\n', path.read_bytes())
+            self.assertEqual(get_codec('stdlib').dumps(load_json_file(path), 'compact'),
+                             path.read_bytes())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from src.core.ledger import WorkLedger
+from src.core.processor import BatchProcessor
+from src.utils.file_handler import get_relative_key, get_shard, select_files
+
+def _run_worker(input_path: str, db_path: str, worker_id: str) -> None:
+    """模拟一个节点上的工作进程"""
+    processor = BatchProcessor(language_code='zh', max_workers=2)
+    with WorkLedger(db_path, worker_id=worker_id, lease_seconds=5) as ledger:
+        processor.process_ledger(input_path, ledger)
+
+class TestWorkLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.data_dir = self.root / 'data'
+        for i in range(20):
+            sub_dir = self.data_dir / f"part{i % 3}"
+            sub_dir.mkdir(parents=True, exist_ok=True)
+            (sub_dir / f"file{i}.json").write_text(
+                json.dumps({"content": f"共有{i}个测试案例"}, ensure_ascii=False), encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shards_partition_files(self):
+        """测试分片互不重叠且覆盖全部文件"""
+        all_files = set(select_files(self.data_dir))
+        shards = [set(select_files(self.data_dir, shard=(k, 4))) for k in range(1, 5)]
+        self.assertEqual(set().union(*shards), all_files)
+        self.assertEqual(sum(len(s) for s in shards), len(all_files))
+        self.assertEqual(get_shard('part0/file0.json', 4), get_shard('part0/file0.json', 4))
+
+    def test_expired_lease_is_reclaimed(self):
+        """测试失联进程的任务在租约过期后被回收"""
+        db_path = self.root / 'ledger.db'
+        with WorkLedger(db_path, worker_id='dead', lease_seconds=0.2) as dead, \
+                WorkLedger(db_path, worker_id='alive', lease_seconds=0.2) as alive:
+            dead.register(['a.json'])
+            self.assertEqual(dead.claim(), 'a.json')
+            self.assertIsNone(alive.claim())
+
+            time.sleep(0.3)
+            self.assertEqual(alive.claim(), 'a.json')
+            self.assertFalse(dead.complete('a.json'))
+            self.assertTrue(alive.complete('a.json'))
+            self.assertEqual(alive.stats(), {'done': 1})
+
+    def test_heartbeat_keeps_lease(self):
+        """测试心跳续约后任务不会被回收"""
+        db_path = self.root / 'ledger.db'
+        with WorkLedger(db_path, worker_id='a', lease_seconds=0.3) as owner, \
+                WorkLedger(db_path, worker_id='b', lease_seconds=0.3) as other:
+            owner.register(['a.json'])
+            owner.claim()
+            owner.start_heartbeat(interval=0.05)
+            time.sleep(0.5)
+            self.assertIsNone(other.claim())
+
+    def test_multiple_processes(self):
+        """测试多个进程共享账本时每个文件只处理一次"""
+        db_path = self.root / 'ledger.db'
+        workers = [
+            multiprocessing.Process(target=_run_worker,
+                                    args=(str(self.data_dir), str(db_path), f"node{i}"))
+            for i in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT path, status, attempts FROM tasks").fetchall()
+        self.assertEqual(len(rows), 20)
+        self.assertTrue(all(status == 'done' and attempts == 1 for _, status, attempts in rows))
+
+        expected = {get_relative_key(f, self.data_dir) for f in select_files(self.data_dir)}
+        self.assertEqual({path for path, _, _ in rows}, expected)
+        self.assertEqual(len(list(self.data_dir.glob('**/*_p.json'))), 20)
+
+if __name__ == '__main__':
+    unittest.main()
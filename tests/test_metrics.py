@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+import urllib.request
+from pathlib import Path
+from src.core.sanitizer import TextSanitizer
+from src.utils.metrics import MetricsRegistry, MetricsSnapshotWriter, metrics, start_http_server
+
+class TestMetrics(unittest.TestCase):
+
+    def test_render_prometheus_text(self):
+        """测试Prometheus文本格式输出"""
+        registry = MetricsRegistry()
+        counter = registry.counter('demo_total', 'Demo counter', ('language',))
+        counter.labels('zh').inc()
+        counter.labels('zh').inc(2)
+        registry.gauge('demo_in_flight', 'Demo gauge').set(3)
+        histogram = registry.histogram('demo_seconds', 'Demo histogram', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.render()
+        self.assertIn('# TYPE demo_total counter', text)
+        self.assertIn('demo_total{language="zh"} 3.0', text)
+        self.assertIn('demo_in_flight 3.0', text)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('demo_seconds_count 3', text)
+
+    def test_registry_reuses_metrics(self):
+        """测试同名指标只注册一次"""
+        registry = MetricsRegistry()
+        self.assertIs(registry.counter('a_total', 'A'), registry.counter('a_total', 'A'))
+        with self.assertRaises(ValueError):
+            registry.gauge('a_total', 'A')
+
+    def test_drain_and_merge(self):
+        """测试取出计数器和直方图增量并合并到另一个注册表，瞬时值不参与汇总"""
+        worker, parent = MetricsRegistry(), MetricsRegistry()
+        for registry in (worker, parent):
+            registry.counter('demo_total', 'Demo counter', ('language',))
+            registry.gauge('demo_in_flight', 'Demo gauge')
+            registry.histogram('demo_seconds', 'Demo histogram', buckets=(0.1, 1.0))
+        worker.counter('demo_total', '', ('language',)).labels('zh').inc(2)
+        worker.gauge('demo_in_flight', '').set(3)
+        worker.histogram('demo_seconds', '').observe(0.5)
+        parent.counter('demo_total', '', ('language',)).labels('zh').inc()
+
+        samples = worker.drain()
+        self.assertEqual(set(samples), {'demo_total', 'demo_seconds'})
+        self.assertEqual(worker.drain(), {})
+        parent.merge(samples)
+
+        text = parent.render()
+        self.assertIn('demo_total{language="zh"} 3.0', text)
+        self.assertIn('demo_seconds_bucket{le="1.0"} 1', text)
+        self.assertNotIn('demo_in_flight 3.0', text)
+
+    def test_sanitizer_metrics(self):
+        """测试清洗器记录每种语言的字符串数、延迟和处理器缓存命中"""
+        latency = metrics.histogram('text_sanitizer_latency_seconds', '', ('language',)).labels('en')
+        cache_hits = metrics.counter('text_sanitizer_processor_cache_total', '', ('result',)).labels('hit')
+        before_strings, before_hits = sum(latency.counts), cache_hits.value
+
+        sanitizer = TextSanitizer('en')
+        for _ in range(3):
+            sanitizer.sanitize_text("I have 123 cars")
+
+        self.assertEqual(sum(latency.counts) - before_strings, 3)
+        self.assertEqual(cache_hits.value - before_hits, 2)
+        self.assertIn('text_sanitizer_latency_seconds_bucket{language="en"', metrics.render())
+
+    def test_exporters(self):
+        """测试HTTP导出和快照文件"""
+        registry = MetricsRegistry()
+        registry.counter('export_total', 'Export').inc()
+
+        server = start_http_server(0, registry=registry)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertIn('export_total 1.0', response.read().decode('utf-8'))
+        finally:
+            server.shutdown()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'metrics.prom'
+            writer = MetricsSnapshotWriter(path, interval=60, registry=registry)
+            writer.start()
+            writer.stop()
+            self.assertIn('export_total 1.0', path.read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
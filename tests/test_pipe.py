@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+from src.core.processor import BatchProcessor
+from src.core.streaming import iter_available_lines
+from src.utils.metrics import metrics
+
+class Collector(io.RawIOBase):
+    """记录写出的数据，每次flush时通知等待方"""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.data = b''
+        self.flushed = threading.Event()
+        self.fail = fail
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.fail:
+            raise BrokenPipeError(32, 'Broken pipe')
+        self.data += data
+        return len(data)
+
+    def flush(self):
+        self.flushed.set()
+
+class TestPipe(unittest.TestCase):
+
+    def run_pipe(self, processor, write_input, input_format='jsonl', dst=None):
+        """在后台线程中处理os.pipe输入，由write_input向管道写数据"""
+        read_fd, write_fd = os.pipe()
+        dst = dst or Collector()
+        result = []
+        src = os.fdopen(read_fd, 'rb')
+
+        def target():
+            try:
+                result.append(processor.process_pipe(src, dst, input_format))
+            except BaseException as e:
+                result.append(e)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        with os.fdopen(write_fd, 'wb', buffering=0) as sink:
+            write_input(sink, dst)
+        thread.join(timeout=30)
+        src.close()
+        return result[0], dst.data
+
+    def test_iter_available_lines(self):
+        """测试按到达的数据分批，不完整的行留到下一批"""
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, 'rb') as src:
+            batches = iter_available_lines(src)
+            os.write(write_fd, b'a\nb\nc')
+            self.assertEqual(next(batches), [b'a\n', b'b\n'])
+            os.write(write_fd, b'd\r\ne\rf\n')
+            self.assertEqual(next(batches), [b'cd\r\n', b'e\rf\n'])
+            os.write(write_fd, b'tail')
+            os.close(write_fd)
+            self.assertEqual(list(batches), [[b'tail']])
+
+    def test_records_flushed_before_eof(self):
+        """测试每条记录到达后立即写出，无需等待输入结束"""
+        processor = BatchProcessor(language_code='zh', max_workers=1)
+
+        def write_input(sink, dst):
+            sink.write(json.dumps({'text': '有123辆车'}).encode('utf-8') + b'\n')
+            self.assertTrue(dst.flushed.wait(10))
+            self.assertEqual(json.loads(dst.data), {'text': '有X辆车'})
+            # 不完整的最后一行在输入结束时处理，空行原样保留
+            sink.write(b'\n{"text": "')
+            sink.write('共有5个"}'.encode('utf-8'))
+
+        count, output = self.run_pipe(processor, write_input)
+        self.assertEqual(count, 3)
+        self.assertEqual(output.decode('utf-8'), '{"text":"有X辆车"}\n\n{"text":"共有X个"}\n')
+
+    def test_ordered_parallel_workers(self):
+        """测试进程池并行处理时输出顺序与输入一致"""
+        lines = [json.dumps({'i': i, 'text': f'有{i}辆车'}).encode('utf-8') + b'\n' for i in range(400)]
+
+        def write_input(sink, dst):
+            for start in range(0, len(lines), 10):
+                sink.write(b''.join(lines[start:start + 10]))
+
+        strings = metrics.histogram('text_sanitizer_latency_seconds', '', ('language',)).labels('zh')
+        before = sum(strings.counts)
+        with mock.patch('src.core.processor.os.cpu_count', return_value=2):
+            processor = BatchProcessor(language_code='zh', max_workers=2)
+            count, output = self.run_pipe(processor, write_input)
+        self.assertEqual(count, 400)
+        # 工作进程中的清洗指标汇总到主进程
+        self.assertEqual(sum(strings.counts) - before, 400)
+        self.assertEqual([json.loads(line) for line in output.splitlines()],
+                         [{'i': i, 'text': '有X辆车'} for i in range(400)])
+
+    def test_text_and_json_formats(self):
+        """测试纯文本保留换行符，JSON文档整体处理"""
+        processor = BatchProcessor(language_code='zh', max_workers=1, output_format='compact')
+        _, output = self.run_pipe(
+            processor, lambda sink, dst: sink.write('今天是2025年\r\n有1辆车'.encode('utf-8')), 'txt')
+        self.assertEqual(output, '今天是X年\r\n有X辆车'.encode('utf-8'))
+
+        _, output = self.run_pipe(
+            processor, lambda sink, dst: sink.write('{"a": ["共有5个"]}'.encode('utf-8')), 'json')
+        self.assertEqual(output, '{"a":["共有X个"]}\n'.encode('utf-8'))
+
+    def test_broken_pipe(self):
+        """测试下游关闭管道时抛出BrokenPipeError，进程池中未完成的任务被取消"""
+        lines = b''.join(json.dumps({'text': f'有{i}辆车'}).encode('utf-8') + b'\n'
+                         for i in range(100))
+        for workers in (1, 2):
+            with self.subTest(workers=workers), \
+                    mock.patch('src.core.processor.os.cpu_count', return_value=2):
+                processor = BatchProcessor(language_code='zh', max_workers=workers)
+                error, _ = self.run_pipe(processor, lambda sink, dst: sink.write(lines),
+                                         dst=Collector(fail=True))
+                self.assertIsInstance(error, BrokenPipeError)
+
+if __name__ == '__main__':
+    unittest.main()
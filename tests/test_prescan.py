@@ -0,0 +1,52 @@
+import unittest
+from src.core.prescan import PRESCAN_AVAILABLE, prescan_batch
+from src.core.sanitizer import TextSanitizer
+from src.utils.metrics import metrics
+
+@unittest.skipUnless(PRESCAN_AVAILABLE, "numpy is not installed")
+class TestPrescan(unittest.TestCase):
+
+    def test_flags(self):
+        """测试预扫描标志"""
+        texts = ['纯文本', '有123辆车', 'a  b', 'tab\there', '《书名》', 'None', '', '１２个']
+        scan = prescan_batch(texts, '《》')
+        self.assertEqual(scan.needs_processing.tolist(),
+                         [False, True, True, True, True, True, False, True])
+        self.assertEqual(scan.has_digit.tolist(),
+                         [False, True, False, False, False, False, False, True])
+
+    def test_batch_matches_per_string(self):
+        """测试批量清洗结果与逐条清洗一致"""
+        texts = [
+            '今天是2025年8月7日', '没有数字的句子', ' 首尾空格 ', '多个  空格', '他说“你好”',
+            'None', '《三体》第3部', 'I have 123 cars', 'plain english text',
+            '', 'ＡＢＣ１２３',
+        ]
+        for language in ('zh', 'en'):
+            expected = [TextSanitizer(language).sanitize_text(text) for text in texts]
+            self.assertEqual(TextSanitizer(language, prescan=True).sanitize_batch(texts), expected)
+
+    def test_auto_matches_per_string(self):
+        """测试自动语言模式下批量清洗结果与逐条清洗一致"""
+        from langdetect import DetectorFactory
+        DetectorFactory.seed = 0
+        texts = [
+            'Hola 45 personas', 'Il y a 123 voitures le 12/05/2024', 'ID 5 ok',
+            '今天是2025年8月7日', 'I have 123 cars today', '没有数字的句子', 'plain english text',
+        ]
+        expected = [TextSanitizer('auto').sanitize_text(text) for text in texts]
+        self.assertEqual(TextSanitizer('auto', prescan=True).sanitize_batch(texts), expected)
+
+    def test_json_batch_and_skip_count(self):
+        """测试批量清洗JSON数据并统计跳过的字符串"""
+        skipped = metrics.counter('text_sanitizer_prescan_skipped_total', '').labels()
+        before = skipped.value
+
+        records = [{'a': '有123辆车', 'b': ['无需处理', 5, None]}, {'c': {'d': '共有5个'}}]
+        sanitizer = TextSanitizer('zh', prescan=True)
+        self.assertEqual(sanitizer.sanitize_json_batch(records),
+                         [{'a': '有X辆车', 'b': ['无需处理', 5, None]}, {'c': {'d': '共有X个'}}])
+        self.assertEqual(skipped.value - before, 1)
+
+if __name__ == '__main__':
+    unittest.main()
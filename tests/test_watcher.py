@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from src.core.processor import BatchProcessor
+from src.core.watcher import DirectoryWatcher, inotify_available
+
+def wait_for(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_polling_debounces_partial_files(self):
+        """测试轮询模式下仍在写入的文件不会提前就绪"""
+        with DirectoryWatcher(self.root, ('json',), debounce=0.2, poll_interval=0.02,
+                              use_inotify=False) as watcher:
+            path = self.root / 'a.json'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{"text": ')
+                f.flush()
+                for _ in range(5):
+                    self.assertEqual(watcher.poll(), [])
+                f.write('"有1辆车"}')
+            self.assertTrue(wait_for(lambda: path in watcher.poll()))
+            (self.root / 'a_p.json').write_text('{}', encoding='utf-8')
+            (self.root / 'notes.md').write_text('', encoding='utf-8')
+            self.assertFalse(wait_for(lambda: watcher.poll(), timeout=0.5))
+
+    def run_watch(self, use_inotify: bool) -> None:
+        (self.root / 'old.json').write_text(json.dumps({'text': '有1辆车'}), encoding='utf-8')
+        (self.root / 'done.json').write_text(json.dumps({'text': '有2辆车'}), encoding='utf-8')
+        (self.root / 'done_p.json').write_text('{}', encoding='utf-8')
+        os.utime(self.root / 'done.json', ns=(0, 0))
+
+        processor = BatchProcessor(language_code='zh', max_workers=2)
+        stop_event = threading.Event()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(processor.process_watch(
+            str(self.root), stop_event, debounce=0.1, poll_interval=0.02,
+            use_inotify=use_inotify)))
+        thread.start()
+        try:
+            self.assertTrue(wait_for((self.root / 'old_p.json').exists))
+
+            # 先写临时文件再改名落地，并在新建的子目录中写入文件
+            (self.root / 'new.tmp').write_text(json.dumps({'text': '共有5个'}), encoding='utf-8')
+            os.replace(self.root / 'new.tmp', self.root / 'new.json')
+            (self.root / 'sub').mkdir()
+            (self.root / 'sub' / 'deep.json').write_text(json.dumps({'text': '第3个'}),
+                                                        encoding='utf-8')
+            self.assertTrue(wait_for((self.root / 'new_p.json').exists))
+            self.assertTrue(wait_for((self.root / 'sub' / 'deep_p.json').exists))
+        finally:
+            stop_event.set()
+            thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(result, [3])
+        self.assertEqual(json.loads((self.root / 'new_p.json').read_text(encoding='utf-8')),
+                         {'text': '共有X个'})
+        self.assertEqual((self.root / 'done_p.json').read_text(encoding='utf-8'), '{}')
+
+    def test_watch_polling(self):
+        """测试轮询模式持续处理新文件并可正常停止"""
+        self.run_watch(use_inotify=False)
+
+    @unittest.skipUnless(inotify_available(), "inotify is not available")
+    def test_watch_inotify(self):
+        """测试inotify模式持续处理新文件并可正常停止"""
+        self.run_watch(use_inotify=True)
+
+if __name__ == '__main__':
+    unittest.main()